@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Compares to_dataframe with object and string[pyarrow] columns:
+conversion time, peak traced memory, DataFrame memory and time to
+write the DataFrame to Parquet.
+
+    python benchmarks/bench_arrow.py [subjects]
+"""
+
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+from rdflib import Graph, Literal, Namespace
+from rdflib.namespace import SKOS
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rdfpandas import to_dataframe, TermDictionary
+
+
+def make_graph(subjects: int) -> Graph:
+    rdfpandas = Namespace('http://github.com/cadmiumkitty/rdfpandas/')
+    g = Graph()
+    g.bind('rdfpandas', rdfpandas)
+    for i in range(subjects):
+        s = rdfpandas[f's{i}']
+        g.add((s, rdfpandas.string, Literal(f'String {i}')))
+        g.add((s, SKOS.prefLabel, Literal(f'Label {i}', lang = 'en')))
+        g.add((s, SKOS.broader, rdfpandas[f's{i // 10}']))
+        # Sparse columns make pandas align indices of different columns
+        if i % 3 == 0:
+            g.add((s, SKOS.prefLabel, Literal(f'Libellé {i}', lang = 'fr')))
+    return g
+
+
+def measure(name: str, g: Graph, td: TermDictionary, string_storage: str):
+    start = time.perf_counter()
+    to_dataframe(g, td, string_storage = string_storage)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    df = to_dataframe(g, td, string_storage = string_storage)
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    df.to_parquet(io.BytesIO(), index = True)
+    parquet = time.perf_counter() - start
+
+    size = df.memory_usage(index = True, deep = True).sum()
+    print(f'{name:<8} to_dataframe {elapsed:.3f}s, peak {peak / 2 ** 20:.1f} MiB, '
+        f'frame {size / 2 ** 20:.1f} MiB, to_parquet {parquet:.3f}s')
+
+
+def main(subjects: int):
+    g = make_graph(subjects)
+    print(f'{len(g)} triples, {subjects} subjects')
+    # Shared dictionary so that both runs measure conversion and not encoding
+    td = TermDictionary()
+    to_dataframe(g, td)
+    measure('object', g, td, None)
+    measure('pyarrow', g, td, 'pyarrow')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Measures cold (convert and store) and warm (fingerprint and load)
+latency of ConversionCache for to_dataframe and to_graph.
+
+    python benchmarks/bench_cache.py [subjects]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from rdflib import Graph, Literal, Namespace
+from rdflib.namespace import SKOS
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rdfpandas.cache import ConversionCache
+
+
+def make_graph(subjects: int) -> Graph:
+    rdfpandas = Namespace('http://github.com/cadmiumkitty/rdfpandas/')
+    g = Graph()
+    g.bind('rdfpandas', rdfpandas)
+    for i in range(subjects):
+        s = rdfpandas[f's{i}']
+        g.add((s, rdfpandas.string, Literal(f'String {i}')))
+        g.add((s, rdfpandas.integer, Literal(i)))
+        g.add((s, SKOS.prefLabel, Literal(f'Label {i}', lang = 'en')))
+        g.add((s, SKOS.prefLabel, Literal(f'Libellé {i}', lang = 'fr')))
+        g.add((s, SKOS.broader, rdfpandas[f's{i // 10}']))
+    return g
+
+
+def measure(name: str, convert, repeat: int = 3):
+    start = time.perf_counter()
+    convert()
+    cold = time.perf_counter() - start
+    warm = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        convert()
+        warm.append(time.perf_counter() - start)
+    print(f'{name:<14} cold {cold:.3f}s, warm {min(warm):.3f}s, {cold / min(warm):.1f}x')
+
+
+def main(subjects: int):
+    g = make_graph(subjects)
+    print(f'{len(g)} triples, {subjects} subjects')
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ConversionCache(directory)
+        measure('to_dataframe', lambda: cache.to_dataframe(g))
+        df = cache.to_dataframe(g)
+        measure('to_graph', lambda: cache.to_graph(df, g.namespace_manager))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
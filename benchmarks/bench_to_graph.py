@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Measures to_graph throughput on the Memory store and on local on-disk
+stores (BerkeleyDB and Oxigraph through oxrdflib, when installed),
+comparing one Graph.add per triple with batched Graph.addN.
+
+    python benchmarks/bench_to_graph.py [rows]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from rdflib import Graph
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import rdfpandas
+from rdfpandas.graph import _get_triples
+
+
+def make_dataframe(rows: int) -> pd.DataFrame:
+    index = [f'http://github.com/cadmiumkitty/rdfpandas/s{i}' for i in range(rows)]
+    return pd.DataFrame({
+        'http://github.com/cadmiumkitty/rdfpandas/string{Literal}': pd.Series([f'String {i}' for i in range(rows)], index = index, dtype = np.str_),
+        'http://github.com/cadmiumkitty/rdfpandas/integer{Literal}(xsd:integer)': pd.Series(np.arange(rows), index = index),
+        'http://github.com/cadmiumkitty/rdfpandas/curie{URIRef}': pd.Series(['skos:broader'] * rows, index = index, dtype = np.str_),
+        'http://github.com/cadmiumkitty/rdfpandas/label{Literal}@en': pd.Series([f'Label {i % 100}' for i in range(rows)], index = index, dtype = np.str_)
+        })
+
+
+def open_graph(store: str, path: str) -> Graph:
+    g = Graph(store = store)
+    if store != 'Memory':
+        g.open(os.path.join(path, store), create = True)
+    return g
+
+
+def add_per_triple(df: pd.DataFrame, g: Graph):
+    prefixes = dict(g.namespace_manager.namespaces())
+    for triple in _get_triples(df, prefixes):
+        g.add(triple)
+
+
+def main(rows: int):
+    df = make_dataframe(rows)
+    triples = int(df.notna().sum().sum())
+    for store in ['Memory', 'BerkeleyDB', 'Oxigraph']:
+        for (name, convert) in [
+                ('add', add_per_triple),
+                ('addN', lambda df, g: rdfpandas.to_graph(df, graph = g))]:
+            with tempfile.TemporaryDirectory() as path:
+                try:
+                    g = open_graph(store, path)
+                except Exception as e:
+                    print(f'{store:<12} skipped: {e.__class__.__name__}: {e}')
+                    break
+                start = time.perf_counter()
+                convert(df, g)
+                g.commit() if store != 'Memory' else None
+                elapsed = time.perf_counter() - start
+                assert len(g) == triples
+                g.close()
+                print(f'{store:<12} {name:<5} {triples} triples in {elapsed:.2f}s, {triples / elapsed:,.0f} triples/s')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -1 +1,5 @@
-from .graph import to_graph, to_dataframe
\ No newline at end of file
+from .cache import ConversionCache
+from .graph import to_graph, to_dataframe, to_dataset, dataset_to_dataframe
+from .query import select_to_dataframe
+from .sparql import SparqlUpdateSink, SparqlUpdateError, to_sparql_update
+from .terms import TermDictionary
\ No newline at end of file
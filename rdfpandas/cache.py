@@ -0,0 +1,511 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import pandas as pd
+import numpy as np
+from rdflib import Graph
+from rdflib.namespace import NamespaceManager
+from .graph import to_graph, to_dataframe
+from .terms import TermDictionary
+
+# Changes whenever conversion results or the cache files change
+_VERSION = 4
+
+class ConversionCache:
+    """
+    Opt-in on-disk cache of to_dataframe and to_graph results.
+    Results are stored under a fingerprint of the input: a hash of the
+    Graph triples and namespace bindings, or a hash of the DataFrame index,
+    columns and values, together with the conversion parameters.
+    The Graph hash depends on the iteration order of triples unless
+    to_dataframe is called with order='canonical', and on the terms of
+    the TermDictionary with order='none'.
+    DataFrames are stored as Parquet when pyarrow is installed and
+    pickled otherwise, Graphs are stored as pickled triples.
+    Least recently used entries are removed once the total size of
+    the cache exceeds max_bytes.
+
+    Parameters
+    ----------
+    directory : str
+        Directory to store cached results in. Created if it does not exist.
+    max_bytes : int
+        Maximum total size of cached results in bytes.
+
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1024 ** 3):
+        if max_bytes < 0:
+            raise ValueError(f'Maximum size must not be negative but was {max_bytes}')
+
+        os.makedirs(directory, exist_ok = True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def to_dataframe(self, g: Graph, **kwargs) -> pd.DataFrame:
+        """
+        Returns cached to_dataframe result for the Graph, converting and
+        caching it on the first call.
+
+        Parameters
+        ----------
+        g : rdflib.Graph
+            rdfLib Graph.
+        **kwargs
+            Other parameters of to_dataframe.
+
+        Returns
+        -------
+        pd.DataFrame
+            Pandas DataFrame created from rdfLib Graph.
+
+        """
+
+        # Only canonical order does not depend on the order of triples, and only
+        # order none depends on the order of terms in the TermDictionary.
+        # Run size and directory of external sorting do not change the result
+        order = kwargs.get('order', 'stable')
+        parameters = {name: value for (name, value) in kwargs.items() if name not in ('term_dictionary', 'run_size', 'directory')}
+        if order == 'none' and kwargs.get('term_dictionary') is not None:
+            parameters['term_dictionary'] = _get_term_dictionary_fingerprint(kwargs['term_dictionary'])
+        key = _get_key('to_dataframe', _get_graph_fingerprint(g, ordered = order != 'canonical'), parameters)
+        path = self._get_path(key)
+        if path is not None:
+            self.hits = self.hits + 1
+            return _read_dataframe(path)
+
+        self.misses = self.misses + 1
+        df = to_dataframe(g, **kwargs)
+        self._put(key, lambda path: _write_dataframe(df, path))
+
+        return df
+
+    def to_graph(self, df: pd.DataFrame, namespace_manager: NamespaceManager = None) -> Graph:
+        """
+        Returns cached to_graph result for the DataFrame, converting and
+        caching it on the first call.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            DataFrame to be converted into Graph.
+        namespace_manager : rdflib.namespace.NamespaceManager
+            NamespaceManager to use to normalize URIs
+
+        Returns
+        -------
+        rdflib.Graph
+            Graph created from Pandas DataFrame.
+
+        """
+
+        g = Graph(namespace_manager = namespace_manager)
+        key = _get_key('to_graph', _get_dataframe_fingerprint(df, g.namespace_manager), {})
+        path = self._get_path(key)
+        if path is not None:
+            self.hits = self.hits + 1
+            with open(path, 'rb') as f:
+                g.addN((s, p, o, g) for (s, p, o) in pickle.load(f))
+            return g
+
+        self.misses = self.misses + 1
+        g = to_graph(df, graph = g)
+        self._put(key, lambda path: _write_triples(g, path))
+
+        return g
+
+    def clear(self):
+        """
+        Removes all cached results.
+
+        """
+
+        for (path, _, _) in self._get_entries():
+            os.remove(path)
+
+    def _get_path(self, key: str) -> str:
+        """
+        Returns path of the cached result and marks it as recently used.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+
+        Returns
+        -------
+        str
+            Path of the cached result, None if it is not cached.
+
+        """
+
+        for extension in ('.parquet', '.pickle'):
+            path = os.path.join(self.directory, f'{key}{extension}')
+            if os.path.exists(path):
+                os.utime(path)
+                return path
+
+        return None
+
+    def _put(self, key: str, write):
+        """
+        Writes result to a temporary file and moves it in place, so that
+        readers never see partially written results, then evicts least
+        recently used results.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+        write : callable
+            Writes the result to the path it is called with and returns
+            the extension of the file.
+
+        """
+
+        (fd, path) = tempfile.mkstemp(dir = self.directory, prefix = '.tmp-')
+        os.close(fd)
+        try:
+            extension = write(path)
+            os.replace(path, os.path.join(self.directory, f'{key}{extension}'))
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+        self._evict()
+
+    def _get_entries(self) -> list:
+        """
+        Lists cached results.
+
+        Returns
+        -------
+        list
+            Tuples of path, modification time and size of cached results.
+
+        """
+
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(('.parquet', '.pickle')):
+                stat = entry.stat()
+                entries.append((entry.path, stat.st_mtime, stat.st_size))
+
+        return entries
+
+    def _evict(self):
+        """
+        Removes least recently used results until the total size of the
+        cache is at most max_bytes.
+
+        """
+
+        entries = sorted(self._get_entries(), key = lambda entry: entry[1])
+        size = sum(entry[2] for entry in entries)
+        for (path, _, entry_size) in entries:
+            if size <= self.max_bytes:
+                break
+            os.remove(path)
+            size = size - entry_size
+
+def _get_key(conversion: str, fingerprint: str, kwargs: dict) -> str:
+    """
+    Creates cache key from the conversion, input fingerprint and parameters.
+
+    Parameters
+    ----------
+    conversion : str
+        Name of the conversion.
+    fingerprint : str
+        Fingerprint of the input.
+    kwargs : dict
+        Parameters of the conversion.
+
+    Returns
+    -------
+    str
+        Hexadecimal cache key.
+
+    """
+
+    parameters = repr(sorted((name, repr(value)) for (name, value) in kwargs.items()))
+
+    return hashlib.blake2b(f'{_VERSION}|{conversion}|{fingerprint}|{parameters}'.encode('utf-8'), digest_size = 20).hexdigest()
+
+def _get_namespaces(namespace_manager: NamespaceManager) -> str:
+    """
+    Returns namespace bindings as a string independent of binding order.
+
+    Parameters
+    ----------
+    namespace_manager : rdflib.namespace.NamespaceManager
+        NamespaceManager with namespace bindings.
+
+    Returns
+    -------
+    str
+        Sorted prefixes and namespaces.
+
+    """
+
+    return repr(sorted((prefix, str(namespace)) for (prefix, namespace) in namespace_manager.namespaces()))
+
+def _get_graph_fingerprint(g: Graph, ordered: bool = False) -> str:
+    """
+    Creates fingerprint of the Graph triples and namespace bindings.
+    Triple hashes are added up so that the fingerprint does not depend
+    on the order of triples and no sorting is needed, or chained in
+    iteration order if ordered is set.
+
+    Parameters
+    ----------
+    g : rdflib.Graph
+        rdfLib Graph.
+    ordered : bool
+        Whether the fingerprint depends on the iteration order of triples.
+
+    Returns
+    -------
+    str
+        Hexadecimal fingerprint.
+
+    """
+
+    total = 0
+    count = 0
+    chain = hashlib.blake2b(digest_size = 20)
+    for (s, p, o) in g:
+        digest = hashlib.blake2b(f'{s.n3()} {p.n3()} {o.n3()}'.encode('utf-8'), digest_size = 16).digest()
+        if ordered:
+            chain.update(digest)
+        else:
+            total = total + int.from_bytes(digest, 'little')
+        count = count + 1
+    total = total % (1 << 128)
+    ordered_digest = chain.hexdigest() if ordered else ''
+
+    return hashlib.blake2b(f'{count}|{total:032x}|{ordered_digest}|{_get_namespaces(g.namespace_manager)}'.encode('utf-8'), digest_size = 20).hexdigest()
+
+def _get_term_dictionary_fingerprint(td: TermDictionary) -> str:
+    """
+    Creates fingerprint of the terms of the TermDictionary in id order.
+
+    Parameters
+    ----------
+    td : rdfpandas.terms.TermDictionary
+        TermDictionary.
+
+    Returns
+    -------
+    str
+        Hexadecimal fingerprint.
+
+    """
+
+    h = hashlib.blake2b(digest_size = 20)
+    for term_id in range(len(td)):
+        h.update(td.decode(term_id).n3().encode('utf-8'))
+        h.update(b'\n')
+
+    return h.hexdigest()
+
+def _get_dataframe_fingerprint(df: pd.DataFrame, namespace_manager: NamespaceManager) -> str:
+    """
+    Creates fingerprint of the DataFrame index, columns, dtypes and values
+    and of namespace bindings.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame.
+    namespace_manager : rdflib.namespace.NamespaceManager
+        NamespaceManager used to normalize URIs
+
+    Returns
+    -------
+    str
+        Hexadecimal fingerprint.
+
+    """
+
+    h = hashlib.blake2b(digest_size = 20)
+    h.update(repr([str(column) for column in df.columns]).encode('utf-8'))
+    h.update(repr([str(dtype) for dtype in df.dtypes]).encode('utf-8'))
+    h.update(_get_namespaces(namespace_manager).encode('utf-8'))
+    if isinstance(df.index, pd.MultiIndex):
+        for level in range(df.index.nlevels):
+            h.update(_get_values_hash(df.index.get_level_values(level)))
+    else:
+        h.update(_get_values_hash(df.index))
+    for (_, series) in df.items():
+        h.update(_get_values_hash(series))
+
+    return h.hexdigest()
+
+def _get_values_hash(values) -> bytes:
+    """
+    Hashes values of a Series or Index. pandas hashes object values by
+    their strings, so types of object values are hashed too, as to_graph
+    creates different Literals for 1 and '1'.
+
+    Parameters
+    ----------
+    values : pandas.Series or pandas.Index
+        Values to hash.
+
+    Returns
+    -------
+    bytes
+        uint64 hashes of the values, followed by hashes of their types
+        for object values.
+
+    """
+
+    hashes = pd.util.hash_pandas_object(values, index = False).values.tobytes()
+    if values.dtype != object:
+        return hashes
+
+    types = pd.Series([f'{type(value).__module__}.{type(value).__qualname__}' for value in values], dtype = object)
+
+    return hashes + pd.util.hash_pandas_object(types, index = False).values.tobytes()
+
+def _write_dataframe(df: pd.DataFrame, path: str) -> str:
+    """
+    Writes DataFrame as Parquet with dtypes in the schema metadata,
+    or pickles it if pyarrow is not installed.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame to write.
+    path : str
+        Path of the file.
+
+    Returns
+    -------
+    str
+        Extension of the written file.
+
+    """
+
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        df.to_pickle(path)
+        return '.pickle'
+
+    table = pyarrow.Table.from_pandas(df, preserve_index = True)
+    dtypes = {
+        'columns': [_get_dtype_spec(dtype) for dtype in df.dtypes],
+        'index': _get_dtype_spec(df.index.dtype)
+    }
+    metadata = dict(table.schema.metadata or {})
+    metadata[b'rdfpandas'] = json.dumps(dtypes).encode('utf-8')
+    pyarrow.parquet.write_table(table.replace_schema_metadata(metadata), path)
+
+    return '.parquet'
+
+def _read_dataframe(path: str) -> pd.DataFrame:
+    """
+    Reads DataFrame written by _write_dataframe.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+
+    Returns
+    -------
+    pandas.DataFrame
+        DataFrame with the same dtypes as the written one.
+
+    """
+
+    if path.endswith('.pickle'):
+        return pd.read_pickle(path)
+
+    import pyarrow.parquet
+    table = pyarrow.parquet.read_table(path)
+    dtypes = json.loads(table.schema.metadata[b'rdfpandas'])
+    df = table.to_pandas()
+    if len(df.columns):
+        df = df.astype(dict(zip(df.columns, [_get_dtype(spec) for spec in dtypes['columns']])))
+    df.index = df.index.astype(_get_dtype(dtypes['index']))
+
+    return df
+
+def _get_dtype_spec(dtype) -> object:
+    """
+    Creates JSON serializable description of the dtype. String dtypes are
+    described by storage and missing value, since their names do not
+    include the storage in all pandas versions.
+
+    Parameters
+    ----------
+    dtype : numpy.dtype or pandas.api.extensions.ExtensionDtype
+        dtype to describe.
+
+    Returns
+    -------
+    object
+        Name of the dtype, or dict with storage and missing value of
+        string dtypes.
+
+    """
+
+    if isinstance(dtype, pd.StringDtype):
+        return {'storage': dtype.storage, 'na_value': 'NA' if getattr(dtype, 'na_value', pd.NA) is pd.NA else 'nan'}
+
+    return str(dtype)
+
+def _get_dtype(spec: object) -> object:
+    """
+    Creates dtype described by _get_dtype_spec.
+
+    Parameters
+    ----------
+    spec : object
+        Name of the dtype, or dict with storage and missing value of
+        string dtypes.
+
+    Returns
+    -------
+    object
+        dtype to pass to astype.
+
+    """
+
+    if isinstance(spec, dict):
+        if spec['na_value'] == 'NA':
+            return pd.StringDtype(spec['storage'])
+        return pd.StringDtype(spec['storage'], na_value = np.nan)
+
+    return spec
+
+def _write_triples(g: Graph, path: str) -> str:
+    """
+    Pickles Graph triples.
+
+    Parameters
+    ----------
+    g : rdflib.Graph
+        Graph to write.
+    path : str
+        Path of the file.
+
+    Returns
+    -------
+    str
+        Extension of the written file.
+
+    """
+
+    with open(path, 'wb') as f:
+        pickle.dump(list(g), f, protocol = pickle.HIGHEST_PROTOCOL)
+
+    return '.pickle'
@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+import argparse
+import collections
+import concurrent.futures
+import io
+import os
+import sys
+import tempfile
+import time
+import pandas as pd
+from rdflib import Graph, Namespace
+from rdflib.namespace import NamespaceManager
+from rdflib.plugins.serializers.turtle import TurtleSerializer
+from .graph import to_graph, to_dataframe
+
+_FORMATS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.ttl': 'turtle',
+    '.turtle': 'turtle',
+    '.nt': 'nt'
+}
+
+_FRAME_FORMATS = ('csv', 'parquet')
+
+_GRAPH_FORMATS = ('turtle', 'nt')
+
+class _LabelledTurtleSerializer(TurtleSerializer):
+    """
+    Turtle serializer that writes every blank node with its _: label
+    instead of as [ ], so that blank nodes written in different chunks of
+    the same file are the same node when the file is parsed.
+
+    """
+
+    def s_squared(self, subject) -> bool:
+        return False
+
+    def p_squared(self, node, position: int, newline: bool = False) -> bool:
+        return False
+
+def main(argv: list = None) -> int:
+    """
+    Converts CSV or Parquet files into Turtle or N-Triples and back.
+    DataFrame files are read in chunks of rows that are converted by a pool
+    of worker processes and written to the output as soon as they are ready,
+    so memory use is bounded by chunk size and number of workers.
+    Graph files are parsed as a whole, since every subject needs all of its
+    statements to create the columns of the DataFrame.
+
+    Parameters
+    ----------
+    argv : list
+        Command line arguments, sys.argv[1:] if not provided.
+
+    Returns
+    -------
+    int
+        Exit status.
+
+    """
+
+    parser = argparse.ArgumentParser(prog = 'rdfpandas', description = 'Convert CSV or Parquet to Turtle or N-Triples and back.')
+    parser.add_argument('input', help = 'input file (.csv, .parquet, .ttl or .nt)')
+    parser.add_argument('output', help = 'output file (.csv, .parquet, .ttl or .nt)')
+    parser.add_argument('--from', dest = 'input_format', choices = _FRAME_FORMATS + _GRAPH_FORMATS, help = 'input format, inferred from file extension by default')
+    parser.add_argument('--to', dest = 'output_format', choices = _FRAME_FORMATS + _GRAPH_FORMATS, help = 'output format, inferred from file extension by default')
+    parser.add_argument('--prefix', action = 'append', default = [], metavar = 'PREFIX=NAMESPACE', help = 'namespace binding, can be repeated')
+    parser.add_argument('--index-col', default = '@id', help = 'column with subjects (default: @id)')
+    parser.add_argument('--order', choices = ('stable', 'external', 'canonical', 'none'), default = 'stable', help = 'order of rows and columns when converting to CSV or Parquet (default: stable)')
+    parser.add_argument('--chunk-size', type = int, default = 10000, help = 'rows per chunk (default: 10000)')
+    parser.add_argument('--workers', type = int, default = os.cpu_count(), help = 'worker processes (default: number of CPUs)')
+    parser.add_argument('--quiet', action = 'store_true', help = 'do not report throughput')
+    args = parser.parse_args(argv)
+
+    input_format = args.input_format or _get_format(parser, args.input)
+    output_format = args.output_format or _get_format(parser, args.output)
+    if args.chunk_size < 1:
+        parser.error(f'chunk size must be positive but was {args.chunk_size}')
+    if args.workers < 1:
+        parser.error(f'workers must be positive but was {args.workers}')
+
+    bindings = []
+    for binding in args.prefix:
+        prefix, _, namespace = binding.partition('=')
+        if not prefix or not namespace:
+            parser.error(f'prefix must be PREFIX=NAMESPACE but was {binding}')
+        bindings.append((prefix, namespace))
+
+    if not ((input_format in _FRAME_FORMATS and output_format in _GRAPH_FORMATS) or (input_format in _GRAPH_FORMATS and output_format in _FRAME_FORMATS)):
+        parser.error(f'can only convert between {", ".join(_FRAME_FORMATS)} and {", ".join(_GRAPH_FORMATS)} but was {input_format} to {output_format}')
+
+    start = time.perf_counter()
+    try:
+        if input_format in _FRAME_FORMATS:
+            (rows, triples) = _frame_to_graph(args.input, input_format, args.output, output_format, bindings, args.index_col, args.chunk_size, args.workers)
+        else:
+            (rows, triples) = _graph_to_frame(args.input, input_format, args.output, output_format, bindings, args.index_col, args.order)
+    except (OSError, ValueError, SyntaxError) as e:
+        # Input that can not be read or converted, the output is left unchanged
+        print(f'rdfpandas: error: {e}', file = sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        print(f'Converted {rows} rows and {triples} triples in {elapsed:.2f}s '
+            f'({rows / elapsed:,.0f} rows/s, {triples / elapsed:,.0f} triples/s)', file = sys.stderr)
+
+    return 0
+
+def _get_format(parser: argparse.ArgumentParser, path: str) -> str:
+    """
+    Infers format from the file extension.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        Parser to report an error with.
+    path : str
+        Path of the file.
+
+    Returns
+    -------
+    str
+        Format of the file.
+
+    """
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in _FORMATS:
+        parser.error(f'can not infer format of {path}, use --from or --to')
+
+    return _FORMATS[extension]
+
+def _get_namespace_manager(bindings: list) -> NamespaceManager:
+    """
+    Creates NamespaceManager with namespace bindings.
+
+    Parameters
+    ----------
+    bindings : list
+        Tuples of prefix and namespace.
+
+    Returns
+    -------
+    rdflib.namespace.NamespaceManager
+        NamespaceManager with the namespaces bound.
+
+    """
+
+    namespace_manager = NamespaceManager(Graph())
+    for (prefix, namespace) in bindings:
+        namespace_manager.bind(prefix, Namespace(namespace), override = True, replace = True)
+
+    return namespace_manager
+
+def _write_output(output_path: str, write) -> object:
+    """
+    Writes output to a temporary file in the directory of the output and
+    moves it in place once it is complete, so that a failed conversion
+    never leaves a partially written or truncated output file.
+
+    Parameters
+    ----------
+    output_path : str
+        Path of the output file.
+    write : callable
+        Writes the output to the path it is called with.
+
+    Returns
+    -------
+    object
+        Result of write.
+
+    """
+
+    (fd, path) = tempfile.mkstemp(dir = os.path.dirname(os.path.abspath(output_path)), prefix = '.tmp-')
+    os.close(fd)
+    try:
+        result = write(path)
+        # Temporary files are only readable by the owner, output files get the usual permissions
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(path, 0o666 & ~umask)
+        os.replace(path, output_path)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+    return result
+
+def _read_chunks(path: str, input_format: str, index_col: str, chunk_size: int):
+    """
+    Reads DataFrame file in chunks of rows.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+    input_format : str
+        Format of the file, csv or parquet.
+    index_col : str
+        Column with subjects.
+    chunk_size : int
+        Number of rows per chunk.
+
+    Returns
+    -------
+    generator
+        DataFrame chunks with subjects as index.
+
+    """
+
+    if input_format == 'csv':
+        # Values are read as strings so that types are not inferred differently for every chunk
+        yield from pd.read_csv(path, index_col = index_col, chunksize = chunk_size, dtype = str)
+    else:
+        import pyarrow.parquet
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size = chunk_size):
+            df = batch.to_pandas()
+            if index_col in df.columns:
+                df = df.set_index(index_col)
+            yield df
+
+def _convert_chunk(df: pd.DataFrame, bindings: list, output_format: str) -> tuple:
+    """
+    Converts DataFrame chunk into serialized Graph. Runs in worker processes.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame chunk.
+    bindings : list
+        Tuples of prefix and namespace.
+    output_format : str
+        Format to serialize Graph to, turtle or nt.
+
+    Returns
+    -------
+    tuple
+        Number of rows, number of triples and serialized Graph.
+
+    """
+
+    g = to_graph(df, _get_namespace_manager(bindings))
+    if output_format == 'turtle':
+        stream = io.BytesIO()
+        _LabelledTurtleSerializer(g).serialize(stream, encoding = 'utf-8')
+        data = stream.getvalue().decode('utf-8')
+    else:
+        data = g.serialize(format = output_format)
+
+    return (len(df), len(g), data)
+
+def _frame_to_graph(input_path: str, input_format: str, output_path: str, output_format: str, bindings: list, index_col: str, chunk_size: int, workers: int) -> tuple:
+    """
+    Converts DataFrame file into Graph file chunk by chunk.
+
+    Returns
+    -------
+    tuple
+        Number of rows and number of triples.
+
+    """
+
+    chunks = _read_chunks(input_path, input_format, index_col, chunk_size)
+
+    return _write_output(output_path, lambda path: _write_chunks(chunks, path, bindings, output_format, workers))
+
+def _write_chunks(chunks, path: str, bindings: list, output_format: str, workers: int) -> tuple:
+    """
+    Converts DataFrame chunks and writes them to the Graph file, keeping at
+    most two chunks per worker in flight and writing chunks in input order.
+
+    Returns
+    -------
+    tuple
+        Number of rows and number of triples.
+
+    """
+
+    rows = 0
+    triples = 0
+
+    with open(path, 'w', encoding = 'utf-8') as output:
+        if workers == 1:
+            for df in chunks:
+                (chunk_rows, chunk_triples, data) = _convert_chunk(df, bindings, output_format)
+                output.write(data)
+                rows = rows + chunk_rows
+                triples = triples + chunk_triples
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+                pending = collections.deque()
+                for df in chunks:
+                    pending.append(executor.submit(_convert_chunk, df, bindings, output_format))
+                    while len(pending) >= 2 * workers or (pending and pending[0].done()):
+                        (chunk_rows, chunk_triples, data) = pending.popleft().result()
+                        output.write(data)
+                        rows = rows + chunk_rows
+                        triples = triples + chunk_triples
+                while pending:
+                    (chunk_rows, chunk_triples, data) = pending.popleft().result()
+                    output.write(data)
+                    rows = rows + chunk_rows
+                    triples = triples + chunk_triples
+
+    return (rows, triples)
+
+def _graph_to_frame(input_path: str, input_format: str, output_path: str, output_format: str, bindings: list, index_col: str, order: str) -> tuple:
+    """
+    Converts Graph file into DataFrame file.
+
+    Returns
+    -------
+    tuple
+        Number of rows and number of triples.
+
+    """
+
+    g = Graph()
+    for (prefix, namespace) in bindings:
+        g.bind(prefix, Namespace(namespace), override = True, replace = True)
+    g.parse(input_path, format = input_format)
+    df = to_dataframe(g, order = order)
+    df.index.name = index_col
+
+    _write_output(output_path, lambda path: _write_frame(df, path, output_format))
+
+    return (len(df), len(g))
+
+def _write_frame(df: pd.DataFrame, path: str, output_format: str):
+    """
+    Writes DataFrame file.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame to write.
+    path : str
+        Path of the file.
+    output_format : str
+        Format of the file, csv or parquet.
+
+    """
+
+    if output_format == 'csv':
+        df.to_csv(path, index = True)
+    else:
+        df.to_parquet(path, index = True)
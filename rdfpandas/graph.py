@@ -1,12 +1,20 @@
 # -*- coding: utf-8 -*-
 import pandas as pd
 import numpy as np
-from rdflib import Graph, Literal, URIRef, BNode
+from rdflib import Graph, ConjunctiveGraph, Dataset, Literal, URIRef, BNode
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
 from rdflib.term import Identifier
 from rdflib.namespace import NamespaceManager
+from .terms import TermDictionary
+import itertools
 import re
 
-def to_graph(df: pd.DataFrame, namespace_manager: NamespaceManager = None) -> Graph:
+_ORDERS = ('stable', 'external', 'canonical', 'none')
+
+# Terms sorted in memory at a time by order='external'
+_RUN_SIZE = 1000000
+
+def to_graph(df: pd.DataFrame, namespace_manager: NamespaceManager = None, graph: Graph = None, batch_size: int = 10000, context: object = None) -> Graph:
     """
     Takes Pandas DataFrame and returns RDFLib Graph.
     Row indices are used as subjects and column indices as predicates. 
@@ -16,13 +24,24 @@ def to_graph(df: pd.DataFrame, namespace_manager: NamespaceManager = None) -> Gr
     to attempting to construct a new rdfs:List or rdfs:Container.
     Namespaces need to be bound by the user of the method prior
     to serialization.
+    Triples are added in batches using Graph.addN, either to a new Graph
+    or to an existing Graph, ConjunctiveGraph or Dataset and its Store.
 
     Parameters
     ----------
     df : pandas.DataFrame
         DataFrame to be converted into Graph.
     namespace_manager : rdflib.namespace.NamespaceManager
-        NamespaceManager to use to normalize URIs
+        NamespaceManager to use to normalize URIs. Defaults to 
+        NamespaceManager of the graph.
+    graph : rdflib.Graph
+        Existing Graph, ConjunctiveGraph or Dataset to add triples to.
+        New Graph is created if not provided.
+    batch_size : int
+        Number of triples to pass to Graph.addN at once.
+    context : object
+        Graph or identifier of the named graph to add triples to when graph
+        is a ConjunctiveGraph or Dataset. Defaults to the default graph.
 
     Returns
     -------
@@ -30,30 +49,185 @@ def to_graph(df: pd.DataFrame, namespace_manager: NamespaceManager = None) -> Gr
         Graph created from Pandas DataFrame.
 
     """
-    
-    g = Graph(namespace_manager = namespace_manager)
+
+    if batch_size < 1:
+        raise ValueError(f'Batch size must be positive but was {batch_size}')
+
+    if graph is None:
+        g = Graph(namespace_manager = namespace_manager)
+    else:
+        g = graph
+
+    if namespace_manager is None:
+        namespace_manager = g.namespace_manager
 
     prefixes = {}
-    for (prefix, namespace) in g.namespace_manager.namespaces():
+    for (prefix, namespace) in namespace_manager.namespaces():
         prefixes[prefix] = namespace
 
-    for (index, series) in df.iterrows():
-        for (column, value) in series.items():
-            # Matching unreserved, gen-delims and sub-delims with exception of "(", ")", "@", "[" and "]" from RFC 3986
-            match = re.search('([\w\-._~:/?#!$&\'*+,;=]*)(\{(\w*)\})?(\[(\d*)\])?(\(([\w?:/.]*)\))?(@(\w*))?', column)
+    if isinstance(g, Dataset):
+        c = DATASET_DEFAULT_GRAPH_ID if context is None else context
+    elif isinstance(g, ConjunctiveGraph):
+        c = g.default_context if context is None else context
+    elif context is None:
+        c = g
+    else:
+        raise ValueError(f'Can only add triples to context of ConjunctiveGraph or Dataset but was {g.__class__.__name__}')
+
+    batch = []
+    for quad in _get_quads(df, prefixes, itertools.repeat(c)):
+        batch.append(quad)
+        if len(batch) == batch_size:
+            g.addN(batch)
+            batch = []
+    if batch:
+        g.addN(batch)
+
+    return g
+
+def _get_triples(df: pd.DataFrame, prefixes: dict):
+    """
+    Takes Pandas DataFrame and returns triples for all values that are not NA.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame to be converted into triples.
+    prefixes : dict
+        Prefixes to use to normalize URIs
+
+    Returns
+    -------
+    generator
+        Tuples of subject, predicate and object.
+
+    """
+
+    for (s, p, o, _) in _get_quads(df, prefixes, itertools.repeat(None)):
+        yield (s, p, o)
+
+def _get_quads(df: pd.DataFrame, prefixes: dict, contexts):
+    """
+    Takes Pandas DataFrame and returns quads for all values that are not NA.
+    Column index patterns are parsed once per column.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame to be converted into quads.
+    prefixes : dict
+        Prefixes to use to normalize URIs
+    contexts : iterable
+        Context of every row of the DataFrame.
+
+    Returns
+    -------
+    generator
+        Tuples of subject, predicate, object and context.
+
+    """
+
+    columns = []
+    for column in df.columns:
+        # Matching unreserved, gen-delims and sub-delims with exception of "(", ")", "@", "[" and "]" from RFC 3986
+        match = re.search('([\w\-._~:/?#!$&\'*+,;=]*)(\{(\w*)\})?(\[(\d*)\])?(\(([\w?:/.]*)\))?(@(\w*))?', column)
+        columns.append((_get_identifier(prefixes, match.group(1)), match.group(3), match.group(7), match.group(9)))
+
+    for ((index, series), c) in zip(df.iterrows(), contexts):
+        s = None
+        for ((p, instance, datatype, language), (column, value)) in zip(columns, series.items()):
             if pd.notna(value) and pd.notnull(value):
-                s = _get_identifier(prefixes, index)
-                p = _get_identifier(prefixes, match.group(1))
+                if s is None:
+                    s = _get_identifier(prefixes, index)
                 if isinstance(value, bytes):
-                    o = _get_identifier(prefixes, value.decode('utf-8'), match.group(3), match.group(7), match.group(9))
+                    o = _get_identifier(prefixes, value.decode('utf-8'), instance, datatype, language)
                 else:
-                    o = _get_identifier(prefixes, value, match.group(3), match.group(7), match.group(9))
-                g.add((s, p, o))
+                    o = _get_identifier(prefixes, value, instance, datatype, language)
+                yield (s, p, o, c)
 
-    return g
+def to_dataset(df: pd.DataFrame, namespace_manager: NamespaceManager = None, dataset: Dataset = None, batch_size: int = 10000, graph_column: str = '@graph') -> Dataset:
+    """
+    Takes Pandas DataFrame and returns RDFLib Dataset.
+    Named graph of every row is taken from the first level of a two level
+    row MultiIndex, as created by dataset_to_dataframe, with subjects in 
+    the second level, or otherwise from the graph column.
+    Rows without named graph are added to the default graph.
+    Columns are converted as in to_graph, with column index patterns 
+    parsed once for all named graphs.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame to be converted into Dataset.
+    namespace_manager : rdflib.namespace.NamespaceManager
+        NamespaceManager to use to normalize URIs. Defaults to 
+        NamespaceManager of the dataset.
+    dataset : rdflib.Dataset
+        Existing Dataset to add quads to. New Dataset is created if not provided.
+    batch_size : int
+        Number of quads to pass to Dataset.addN at once.
+    graph_column : str
+        Column with named graphs, used if the DataFrame does not have 
+        two level row MultiIndex.
 
+    Returns
+    -------
+    rdflib.Dataset
+        Dataset created from Pandas DataFrame.
+
+    """
+
+    if batch_size < 1:
+        raise ValueError(f'Batch size must be positive but was {batch_size}')
+
+    if dataset is None:
+        d = Dataset()
+        if namespace_manager is not None:
+            for (prefix, namespace) in namespace_manager.namespaces():
+                d.bind(prefix, namespace, override = True, replace = True)
+    else:
+        d = dataset
+
+    if namespace_manager is None:
+        namespace_manager = d.namespace_manager
+
+    prefixes = {}
+    for (prefix, namespace) in namespace_manager.namespaces():
+        prefixes[prefix] = namespace
 
-def to_dataframe(g: Graph) -> pd.DataFrame:
+    if isinstance(df.index, pd.MultiIndex) and df.index.nlevels == 2:
+        graph_names = df.index.get_level_values(0)
+        df = df.set_axis(df.index.get_level_values(1), axis = 0)
+    elif graph_column in df.columns:
+        graph_names = df[graph_column]
+        df = df.drop(columns = [graph_column])
+    else:
+        raise ValueError(f'Can only create Dataset from DataFrame with two level index or {graph_column} column')
+
+    graphs = {}
+    contexts = []
+    for graph_name in graph_names:
+        if pd.isna(graph_name):
+            graph_name = DATASET_DEFAULT_GRAPH_ID
+        if graph_name not in graphs:
+            identifier = _get_identifier(prefixes, graph_name, URIRef.__name__)
+            if identifier is None:
+                raise ValueError(f'Not a valid URI for graph {graph_name}')
+            graphs[graph_name] = d.graph(identifier)
+        contexts.append(graphs[graph_name])
+
+    batch = []
+    for quad in _get_quads(df, prefixes, contexts):
+        batch.append(quad)
+        if len(batch) == batch_size:
+            d.addN(batch)
+            batch = []
+    if batch:
+        d.addN(batch)
+
+    return d
+
+def to_dataframe(g: Graph, term_dictionary: TermDictionary = None, string_storage: str = None, order: str = 'stable', run_size: int = _RUN_SIZE, directory: str = None) -> pd.DataFrame:
     """
     Takes rdfLib Graph object and creates Pandas DataFrame.
     Indices are subjects and attempt is made to construct CURIEs
@@ -67,11 +241,42 @@ def to_dataframe(g: Graph) -> pd.DataFrame:
     result in columns with index in its name.
     No attemps are made at type conversion, all objects are strings in the
     DataFrame.
+    Triples are encoded into integer ids with TermDictionary and strings
+    are only created for the terms that end up in the DataFrame.
 
     Parameters
     ----------
     g : rdflib.Graph
         rdfLib Graph.
+    term_dictionary : rdfpandas.terms.TermDictionary
+        TermDictionary to encode terms with. Reusing the same dictionary
+        for graphs over the same vocabulary avoids re-encoding and 
+        re-sorting the terms.
+    string_storage : str
+        None for object columns and index, or 'pyarrow' for string[pyarrow]
+        columns and index built directly from Arrow arrays of the terms,
+        with missing objects as pd.NA. Requires pyarrow.
+    order : str
+        How objects, subjects and columns are ordered. 'stable' sorts terms
+        in memory on integer and string keys in rdfLib term order, with
+        columns in order of first appearance of subjects in the Graph.
+        'external' gives the same order, sorting the keys in runs of
+        run_size terms spilled to temporary files, so that only one run of
+        sort keys is in memory at a time. Terms, the TermDictionary and the
+        encoded triples are still held in memory.
+        'canonical' sorts terms as 'stable' does and takes columns in order
+        of first appearance of subjects in term order, guaranteeing
+        byte-identical CSV for the same triples and namespace bindings, and
+        so for CSV -> Graph -> CSV round trips reading the CSV with
+        dtype=str. 'none' skips sorting terms and keeps the order in which
+        terms were first seen in the Graph, or in the TermDictionary if it
+        is reused. 'stable', 'external' and 'none' only give the same CSV
+        for the same iteration order of the Graph.
+    run_size : int
+        Number of terms to sort in memory at a time with order='external'.
+    directory : str
+        Directory for temporary run files with order='external'. Default
+        temporary directory if not provided.
 
     Returns
     -------
@@ -80,77 +285,353 @@ def to_dataframe(g: Graph) -> pd.DataFrame:
 
     """
 
-    subjects = {}
-    predicates = {}
+    if term_dictionary is None:
+        term_dictionary = TermDictionary()
 
-    for s in g.subjects():
-        if s not in subjects:
-            subjects[s] = s
-            s_predicates = {}
-            for p, o in sorted(g.predicate_objects(s)):
-                idl = _get_idl_for_identifier(o)
-                if p in s_predicates:
-                    if idl in s_predicates[p]:
-                        s_predicates[p][idl] = s_predicates[p][idl] + 1
-                    else:
-                        s_predicates[p][idl] = 1
-                else:
-                    s_predicates[p] = {idl: 1}
-            for p in s_predicates:
-                if p in predicates:
-                    for idl in s_predicates[p]:
-                        if idl in predicates[p]:
-                            predicates[p][idl] = max(s_predicates[p][idl], predicates[p][idl])
-                        else:
-                            predicates[p][idl] = s_predicates[p][idl]
-                else:
-                    predicates[p] = s_predicates[p]
-
-    series = {}
-
-    for p in predicates:
-        idls_len = len(predicates[p])
-        for idl in predicates[p]:
-            instance = idl[0]
-            datatype = idl[1]
-            language = idl[2]
-            idl_len = predicates[p][idl]
-            for index in range(idl_len):
-                series_name = f'{_get_str_for_uriref(g.namespace_manager, p)}{{{instance}}}'
-                if idl_len > 1:
-                    series_name = ''.join([series_name, f'[{index}]'])
-                if datatype:
-                    series_name = ''.join([series_name, f'({_get_str_for_uriref(g.namespace_manager, datatype)})'])
-                if language:
-                    series_name = ''.join([series_name, f'@{language}'])
-                p_subjects = []
-                p_objects = []
-                if idls_len == 1 and idl_len == 1:
-                    for s, o in sorted(g.subject_objects(p)):
-                        p_subjects.append(_get_str_for_uriref(g.namespace_manager, s))
-                        if isinstance(o, Literal):
-                            p_objects.append(str(o))
-                        else:
-                            p_objects.append(_get_str_for_uriref(g.namespace_manager, o))
-                else:
-                    s_index = 0
-                    last_seen_subject = None
-                    for s, o in sorted(g.subject_objects(p)):
-                        if s != last_seen_subject:
-                            s_index = 0
-                        o_idl = _get_idl_for_identifier(o)
-                        if o_idl == idl:
-                            if s_index == index:
-                                p_subjects.append(_get_str_for_uriref(g.namespace_manager, s))
-                                if isinstance(o, Literal):
-                                    p_objects.append(str(o))
-                                else:
-                                    p_objects.append(_get_str_for_uriref(g.namespace_manager, o))
-                            s_index = s_index + 1
-                        last_seen_subject = s
-                series[series_name] = pd.Series(data = p_objects, index = p_subjects, dtype = np.str_)
-
-    return pd.DataFrame(series)
+    triples = term_dictionary.encode_triples(g.triples((None, None, None)))
+
+    return _get_dataframe(term_dictionary, triples, g.namespace_manager, None, string_storage, order, run_size, directory)
+
+def dataset_to_dataframe(d: Dataset, term_dictionary: TermDictionary = None, string_storage: str = None, order: str = 'stable', run_size: int = _RUN_SIZE, directory: str = None) -> pd.DataFrame:
+    """
+    Takes rdfLib Dataset object and creates Pandas DataFrame in a single
+    scan over all quads.
+    Indices are two level MultiIndex of named graphs and subjects,
+    with the default graph named by its identifier. Attempt is made to 
+    construct CURIEs using namespace manager of the rdfLib Dataset.
+    Columns are shared by all named graphs and are created as in to_dataframe,
+    with multiple objects for the same graph, subject and predicate resulting 
+    in columns with index in its name.
+
+    Parameters
+    ----------
+    d : rdflib.Dataset
+        rdfLib Dataset.
+    term_dictionary : rdfpandas.terms.TermDictionary
+        TermDictionary to encode terms with.
+    string_storage : str
+        None for object columns and index, or 'pyarrow' for string[pyarrow]
+        columns and index levels.
+    order : str
+        'stable', 'external', 'canonical' or 'none', as in to_dataframe.
+    run_size : int
+        Number of terms to sort in memory at a time with order='external'.
+    directory : str
+        Directory for temporary run files with order='external'.
+
+    Returns
+    -------
+    pd.DataFrame
+        Pandas DataFrame created from rdfLib Dataset.
+
+    """
+
+    if term_dictionary is None:
+        term_dictionary = TermDictionary()
+
+    quads = term_dictionary.encode_quads(d.quads((None, None, None, None)))
+
+    return _get_dataframe(term_dictionary, quads[:, 0:3], d.namespace_manager, quads[:, 3], string_storage, order, run_size, directory)
+
+def _get_dataframe(td: TermDictionary, triples: np.ndarray, namespace_manager: NamespaceManager, graphs: np.ndarray, string_storage: str, order: str, run_size: int = _RUN_SIZE, directory: str = None) -> pd.DataFrame:
+    """
+    Creates DataFrame from encoded triples, with object columns and index
+    aligned by pandas, or with string[pyarrow] columns and index aligned
+    on integer row ids and built by taking from a single Arrow array of
+    term strings.
+
+    Parameters
+    ----------
+    td : rdfpandas.terms.TermDictionary
+        TermDictionary used to encode triples.
+    triples : numpy.ndarray
+        int64 array of shape (n, 3) with triples in Graph iteration order.
+    namespace_manager : rdflib.namespace.NamespaceManager
+        NamespaceManager to use to normalize URIs
+    graphs : numpy.ndarray
+        int64 array of graph identifier ids of the triples, or None.
+    string_storage : str
+        None or 'pyarrow'.
+    order : str
+        'stable', 'external', 'canonical' or 'none'.
+    run_size : int
+        Number of terms to sort in memory at a time with order='external'.
+    directory : str
+        Directory for temporary run files with order='external'.
+
+    Returns
+    -------
+    pd.DataFrame
+        Pandas DataFrame created from the triples.
+
+    """
+
+    if string_storage not in (None, 'pyarrow'):
+        raise ValueError(f'String storage must be None or pyarrow but was {string_storage}')
+
+    if order not in _ORDERS:
+        raise ValueError(f'Order must be one of {", ".join(_ORDERS)} but was {order}')
+
+    if run_size < 1:
+        raise ValueError(f'Run size must be positive but was {run_size}')
+
+    if string_storage == 'pyarrow':
+        import pyarrow
+        import pyarrow.compute
+
+    if len(triples) == 0:
+        return pd.DataFrame()
+
+    s = triples[:, 0]
+    o = triples[:, 2]
+    term_ids = np.unique(triples[:, [0, 2]] if graphs is None else np.concatenate((triples[:, [0, 2]].ravel(), graphs)))
+    labels = _get_labels(td, term_ids, namespace_manager)
+    if order == 'none':
+        ranks = np.arange(len(td), dtype = np.int64)
+    elif order == 'external':
+        ranks = np.asarray(td.ranks(run_size = run_size, directory = directory))
+    else:
+        ranks = np.asarray(td.ranks())
+    columns = list(_get_series(td, triples, namespace_manager, ranks, graphs, order == 'canonical'))
+
+    if string_storage is None:
+        series = {}
+        for (series_name, column_entries) in columns:
+            if graphs is None:
+                column_index = labels[s[column_entries]]
+            else:
+                column_index = pd.MultiIndex.from_arrays([labels[graphs[column_entries]], labels[s[column_entries]]])
+            series[series_name] = pd.Series(data = labels[o[column_entries]], index = column_index, dtype = np.str_)
+
+        return pd.DataFrame(series)
+
+    # Term strings in a single Arrow array, addressed by compact term ids
+    compact = np.empty(len(td), dtype = np.int64)
+    compact[term_ids] = np.arange(len(term_ids), dtype = np.int64)
+    strings = pyarrow.array(labels[term_ids], type = pyarrow.string())
+
+    if graphs is None:
+        rows = s
+    else:
+        rows = graphs * len(td) + s
+    row_keys, row_inverse = np.unique(rows, return_inverse = True)
+    row_inverse = row_inverse.reshape(-1)
+    row_s = row_keys % len(td)
+    row_g = row_keys // len(td)
+    n_rows = len(row_keys)
+
+    # Rows are in term order if every column has all rows, as pandas keeps
+    # equal indices, and sorted by their strings otherwise, as pandas sorts
+    # the union of indices
+    if all(len(column_entries) == n_rows for (_, column_entries) in columns):
+        if graphs is None:
+            row_order = np.argsort(ranks[row_s], kind = 'stable')
+        else:
+            row_order = np.lexsort((ranks[row_s], ranks[row_g]))
+    else:
+        row_labels = [strings.take(compact[row_s])]
+        if graphs is not None:
+            row_labels.insert(0, strings.take(compact[row_g]))
+        table = pyarrow.table(row_labels, names = [str(i) for i in range(len(row_labels))])
+        row_order = pyarrow.compute.sort_indices(table, sort_keys = [(name, 'ascending') for name in table.column_names]).to_numpy()
+    row_position = np.empty(n_rows, dtype = np.int64)
+    row_position[row_order] = np.arange(n_rows, dtype = np.int64)
+
+    if graphs is None:
+        index = pd.Index(pd.arrays.ArrowStringArray(strings.take(compact[row_s[row_order]])))
+    else:
+        index = pd.MultiIndex.from_arrays([
+            pd.arrays.ArrowStringArray(strings.take(compact[row_g[row_order]])),
+            pd.arrays.ArrowStringArray(strings.take(compact[row_s[row_order]]))])
+
+    data = {}
+    for (series_name, column_entries) in columns:
+        take = np.zeros(n_rows, dtype = np.int64)
+        missing = np.ones(n_rows, dtype = bool)
+        column_positions = row_position[row_inverse[column_entries]]
+        take[column_positions] = compact[o[column_entries]]
+        missing[column_positions] = False
+        data[series_name] = pd.arrays.ArrowStringArray(strings.take(pyarrow.array(take, mask = missing)))
+
+    return pd.DataFrame(data, index = index, copy = False)
+
+def _get_labels(td: TermDictionary, term_ids: np.ndarray, namespace_manager: NamespaceManager) -> np.ndarray:
+    """
+    Creates strings of the terms as they appear in the DataFrame,
+    literal values for Literals and CURIEs or URIs for other terms.
+
+    Parameters
+    ----------
+    td : rdfpandas.terms.TermDictionary
+        TermDictionary used to encode terms.
+    term_ids : numpy.ndarray
+        Ids of the terms to create strings for.
+    namespace_manager : rdflib.namespace.NamespaceManager
+        NamespaceManager to use to normalize URIs
+
+    Returns
+    -------
+    numpy.ndarray
+        Object array of strings indexed by term id, None for other terms.
+
+    """
+
+    labels = np.empty(len(td), dtype = object)
+    for term_id in term_ids:
+        term = td.decode(term_id)
+        if isinstance(term, Literal):
+            labels[term_id] = str(term)
+        else:
+            labels[term_id] = _get_str_for_uriref(namespace_manager, term)
+
+    return labels
+
+def _get_series(td: TermDictionary, triples: np.ndarray, namespace_manager: NamespaceManager, ranks: np.ndarray, graphs: np.ndarray = None, sort_rows: bool = False):
+    """
+    Groups encoded triples into DataFrame columns. Columns are keyed by 
+    predicate, instance, datatype and language (idl) of the object and
+    position of the object among objects with the same idl for the subject,
+    or for the graph and subject if graphs are provided.
+    Objects and predicates are ordered by ranks of the terms, and columns
+    by first appearance walking rows in Graph iteration order, or in order
+    of ranks if sort_rows is set.
+
+    Parameters
+    ----------
+    td : rdfpandas.terms.TermDictionary
+        TermDictionary used to encode triples.
+    triples : numpy.ndarray
+        int64 array of shape (n, 3) with triples in Graph iteration order.
+    namespace_manager : rdflib.namespace.NamespaceManager
+        NamespaceManager to use to normalize URIs
+    ranks : numpy.ndarray
+        int64 array of positions of the terms in the order, indexed by term id.
+    graphs : numpy.ndarray
+        int64 array of graph identifier ids of the triples.
+    sort_rows : bool
+        Whether to walk rows in order of ranks instead of first appearance.
+
+    Returns
+    -------
+    generator
+        Tuples of column name and positions of the triples in the column,
+        with rows sorted.
+
+    """
+
+    if len(triples) == 0:
+        return
+
+    s = triples[:, 0]
+    p = triples[:, 1]
+    o = triples[:, 2]
+    n = len(triples)
+    o_idl = td.idls()[o]
+    positions = np.arange(n, dtype = np.int64)
+
+    # Rows are subjects, or pairs of graph and subject for quads
+    if graphs is None:
+        rows = s
+    else:
+        rows = graphs * len(td) + s
+    _, row_first, row_inverse = np.unique(rows, return_index = True, return_inverse = True)
+    row_inverse = row_inverse.reshape(-1)
+
+    # Rows in order of first appearance, predicates and objects of each row sorted.
+    # Rows sorted too for canonical order, so that columns in order of first
+    # appearance only depend on the triples and not on their iteration order
+    if not sort_rows:
+        walk = np.lexsort((ranks[o], ranks[p], row_first[row_inverse]))
+    elif graphs is None:
+        walk = np.lexsort((ranks[o], ranks[p], ranks[s]))
+    else:
+        walk = np.lexsort((ranks[o], ranks[p], ranks[s], ranks[graphs]))
+    walk_position = np.empty(n, dtype = np.int64)
+    walk_position[walk] = positions
+
+    # Index of the object among sorted objects with the same idl for the row and predicate
+    grouped = walk[np.lexsort((o_idl[walk], p[walk], row_inverse[walk]))]
+    starts = np.ones(n, dtype = bool)
+    starts[1:] = ((row_inverse[grouped][1:] != row_inverse[grouped][:-1]) | 
+        (p[grouped][1:] != p[grouped][:-1]) | 
+        (o_idl[grouped][1:] != o_idl[grouped][:-1]))
+    index = np.empty(n, dtype = np.int64)
+    index[grouped] = positions - np.maximum.accumulate(np.where(starts, positions, 0))
+
+    # Predicate and idl pairs with their maximum number of objects per row
+    n_idls = int(o_idl.max()) + 1
+    pair_keys, pair_inverse = np.unique(p * n_idls + o_idl, return_inverse = True)
+    pair_inverse = pair_inverse.reshape(-1)
+    pair_first = np.full(len(pair_keys), n, dtype = np.int64)
+    np.minimum.at(pair_first, pair_inverse, walk_position)
+    pair_len = np.zeros(len(pair_keys), dtype = np.int64)
+    np.maximum.at(pair_len, pair_inverse, index + 1)
+
+    # Pairs ordered by first appearance of predicate and then of idl
+    pair_p = pair_keys // n_idls
+    pair_idl = pair_keys % n_idls
+    p_keys, p_inverse = np.unique(pair_p, return_inverse = True)
+    p_inverse = p_inverse.reshape(-1)
+    p_first = np.full(len(p_keys), n, dtype = np.int64)
+    np.minimum.at(p_first, p_inverse, pair_first)
+    pair_order = np.lexsort((pair_first, p_first[p_inverse]))
+    pair_start = np.empty(len(pair_keys), dtype = np.int64)
+    pair_start[pair_order] = np.cumsum(pair_len[pair_order]) - pair_len[pair_order]
+
+    # Objects grouped into columns with rows sorted within each column
+    column = pair_start[pair_inverse] + index
+    if graphs is None:
+        entries = np.lexsort((ranks[s], column))
+    else:
+        entries = np.lexsort((ranks[s], ranks[graphs], column))
+    bounds = np.searchsorted(column[entries], np.arange(int(pair_len.sum()) + 1))
+
+    for pair in pair_order:
+        predicate = td.decode(pair_p[pair])
+        idl = td.idl(pair_idl[pair])
+        idl_len = pair_len[pair]
+        for i in range(idl_len):
+            yield (_get_series_name(namespace_manager, _get_str_for_uriref(namespace_manager, predicate), idl, i, idl_len),
+                entries[bounds[pair_start[pair] + i]:bounds[pair_start[pair] + i + 1]])
+
+def _get_series_name(namespace_manager: NamespaceManager, name: str, idl: tuple, index: int, idl_len: int) -> str:
+    """
+    Creates column name using 
+    "predicate{rdfLib Identifier instance class name}(type)[index]@language"
+    pattern.
+
+    Parameters
+    ----------
+    namespace_manager : rdflib.namespace.NamespaceManager
+        NamespaceManager to use to normalize URIs
+    name : str
+        Normalized predicate or variable name of the column.
+    idl : tuple
+        tuple of instance, datatype and language.
+    index : int
+        Index of the object among objects with the same idl.
+    idl_len : int
+        Maximum number of objects with the same idl.
+
+    Returns
+    -------
+    str
+        Column name.
+
+    """
+
+    instance = idl[0]
+    datatype = idl[1]
+    language = idl[2]
+    series_name = f'{name}{{{instance}}}'
+    if idl_len > 1:
+        series_name = ''.join([series_name, f'[{index}]'])
+    if datatype:
+        series_name = ''.join([series_name, f'({_get_str_for_uriref(namespace_manager, datatype)})'])
+    if language:
+        series_name = ''.join([series_name, f'@{language}'])
+
+    return series_name
 
 def _get_identifier(prefixes: dict, value: object, instance: str = None, datatype: str = None, language: str = None) -> Identifier:
     """
@@ -281,7 +762,7 @@ def _get_uriref_for_curie(prefixes: dict, value: object) -> URIRef:
 
     """
 
-    prefix, name = value.split(':')
+    prefix, name = value.split(':', 1)
     if prefix in prefixes:
         return URIRef(''.join((prefixes[prefix], name)))
     else:
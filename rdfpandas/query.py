@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import itertools
+import pandas as pd
+import numpy as np
+from rdflib import Graph, Literal
+from rdflib.query import Result
+from rdflib.namespace import NamespaceManager
+from .graph import _get_series_name, _get_str_for_uriref
+from .terms import TermDictionary
+
+def select_to_dataframe(result: Result, namespace_manager: NamespaceManager = None, typed: bool = False) -> pd.DataFrame:
+    """
+    Takes rdfLib SPARQL SELECT Result and creates Pandas DataFrame.
+    Rows are solutions and columns are variables. Attempt is made to
+    construct CURIEs for URIs using the namespace manager.
+    If typed is True, column names are created using
+    "variable{rdfLib Identifier instance class name}(type)@language"
+    pattern similar to columns created by to_dataframe, and a variable
+    bound to objects of different types results in several columns.
+    A variable that is not bound in any solution, for example in an empty
+    result, results in a single column named by the variable either way.
+    Unbound variables are NaN. No attemps are made at type conversion,
+    all values are strings in the DataFrame.
+
+    Parameters
+    ----------
+    result : rdflib.query.Result
+        Result of SPARQL SELECT query.
+    namespace_manager : rdflib.namespace.NamespaceManager
+        NamespaceManager to use to normalize URIs
+    typed : bool
+        Create columns for each instance, datatype and language of values.
+
+    Returns
+    -------
+    pd.DataFrame
+        Pandas DataFrame created from SPARQL SELECT Result.
+
+    """
+
+    if result.type != 'SELECT':
+        raise ValueError(f'Can only convert SELECT results but was {result.type}')
+
+    if namespace_manager is None:
+        namespace_manager = NamespaceManager(Graph())
+
+    variables = [str(var) for var in result.vars]
+    n = len(result)
+    td = TermDictionary()
+
+    # Single pass over solutions, ResultRow values are in the order of variables,
+    # so ids of each variable are a column of the encoded rows
+    ids = td.encode_terms(itertools.chain.from_iterable(result)).reshape(n, len(variables)).T
+
+    labels = np.empty(len(td), dtype = object)
+    for term_id in range(len(td)):
+        term = td.decode(term_id)
+        if isinstance(term, Literal):
+            labels[term_id] = str(term)
+        else:
+            labels[term_id] = _get_str_for_uriref(namespace_manager, term)
+
+    idls = td.idls()
+    series = {}
+
+    for (name, var_ids) in zip(variables, ids):
+        bound = var_ids >= 0
+        if not typed or not bound.any():
+            data = np.full(n, np.nan, dtype = object)
+            data[bound] = labels[var_ids[bound]]
+            series[name] = data
+        else:
+            ids_idls = np.where(bound, idls[np.maximum(var_ids, 0)], -1)
+            idl_ids, idl_first = np.unique(ids_idls[bound], return_index = True)
+            for idl_id in idl_ids[np.argsort(idl_first)]:
+                mask = ids_idls == idl_id
+                data = np.full(n, np.nan, dtype = object)
+                data[mask] = labels[var_ids[mask]]
+                series[_get_series_name(namespace_manager, name, td.idl(idl_id), 0, 1)] = data
+
+    return pd.DataFrame(series, index = pd.RangeIndex(n), dtype = object)
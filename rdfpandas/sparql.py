@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import http.client
+import time
+import urllib.parse
+import pandas as pd
+from rdflib import Graph, URIRef
+from rdflib.namespace import NamespaceManager
+from .graph import _get_triples
+
+class SparqlUpdateError(Exception):
+    """
+    Raised when SPARQL Update endpoint rejects the request or
+    the request still fails after all retries.
+
+    """
+
+class SparqlUpdateSink:
+    """
+    Asynchronous sink that converts DataFrame chunks into SPARQL 1.1
+    INSERT DATA requests and sends them to SPARQL Update endpoint.
+    Requests are sent by a fixed number of workers, each keeping its own
+    persistent HTTP connection. Chunks are queued up to the number of
+    workers, so send() waits when all workers are busy. DataFrame chunks
+    are converted in a thread, so that the event loop is not blocked.
+    If the body of async with raises, queued requests are dropped and
+    workers are cancelled instead of sending the remaining requests.
+    Blank nodes are scoped to a single request by SPARQL Update, so
+    the same blank node in different chunks results in different nodes.
+
+    Use as asynchronous context manager:
+
+        async with SparqlUpdateSink('http://localhost:3030/ds/update', namespace_manager) as sink:
+            for start in range(0, len(df), 1000):
+                await sink.send(df.iloc[start:start + 1000])
+
+    Parameters
+    ----------
+    endpoint : str
+        URL of SPARQL Update endpoint.
+    namespace_manager : rdflib.namespace.NamespaceManager
+        NamespaceManager to use to normalize URIs
+    graph : rdflib.URIRef
+        Named graph to insert data into. Default graph if not provided.
+    concurrency : int
+        Number of requests sent at the same time.
+    retries : int
+        Number of times request is retried after connection error or
+        429 and 5xx response.
+    backoff : float
+        Seconds to wait before the first retry, doubled for every next retry.
+    timeout : float
+        Socket timeout in seconds.
+    headers : dict
+        Additional HTTP headers, for example Authorization.
+
+    """
+
+    def __init__(self, endpoint: str, namespace_manager: NamespaceManager = None, graph: URIRef = None,
+            concurrency: int = 4, retries: int = 3, backoff: float = 0.5, timeout: float = 60, headers: dict = None):
+        if concurrency < 1:
+            raise ValueError(f'Concurrency must be positive but was {concurrency}')
+
+        url = urllib.parse.urlsplit(endpoint)
+        if url.scheme not in ('http', 'https'):
+            raise ValueError(f'Can only send requests to http or https endpoint but was {endpoint}')
+
+        if namespace_manager is None:
+            namespace_manager = NamespaceManager(Graph())
+
+        self._url = url
+        self._path = urllib.parse.urlunsplit(('', '', url.path or '/', url.query, ''))
+        self._prefixes = {}
+        for (prefix, namespace) in namespace_manager.namespaces():
+            self._prefixes[prefix] = namespace
+        self._graph = graph
+        self._concurrency = concurrency
+        self._retries = retries
+        self._backoff = backoff
+        self._timeout = timeout
+        self._headers = {'Content-Type': 'application/sparql-update; charset=utf-8'}
+        self._headers.update(headers or {})
+        self._queue = None
+        self._workers = []
+        self._error = None
+        self.requests = 0
+        self.triples = 0
+
+    async def __aenter__(self) -> 'SparqlUpdateSink':
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.close()
+        else:
+            await self.cancel()
+
+    def start(self):
+        """
+        Starts workers. Needs to be called from the running event loop.
+
+        """
+
+        self._queue = asyncio.Queue(maxsize = self._concurrency)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self._concurrency)]
+
+    async def send(self, df: pd.DataFrame, graph: URIRef = None):
+        """
+        Converts DataFrame chunk into INSERT DATA request and queues it for
+        sending. Waits while the queue is full.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            DataFrame chunk to be inserted.
+        graph : rdflib.URIRef
+            Named graph to insert data into. Defaults to graph of the sink.
+
+        """
+
+        self._raise_error()
+        (body, triples) = await asyncio.to_thread(_get_request, df, self._prefixes, graph if graph is not None else self._graph)
+        if triples:
+            await self._queue.put((body, triples))
+
+    async def close(self):
+        """
+        Waits for queued requests to be sent and stops workers.
+        Raises SparqlUpdateError if any of the requests failed.
+
+        """
+
+        for _ in self._workers:
+            await self._queue.put(None)
+        await asyncio.gather(*self._workers)
+        self._workers = []
+        self._raise_error()
+
+    async def cancel(self):
+        """
+        Drops queued requests and stops workers without waiting for
+        requests to be sent. Requests already being sent are not rolled
+        back.
+
+        """
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions = True)
+        self._workers = []
+
+    def _raise_error(self):
+        """
+        Raises the error of the first failed request, if any.
+
+        """
+
+        if self._error is not None:
+            raise self._error
+
+    async def _work(self):
+        """
+        Sends queued requests until None is taken from the queue, keeping
+        one HTTP connection open between requests. After the first failed
+        request the error is kept and remaining requests are dropped.
+        The connection is closed when the worker stops or is cancelled.
+
+        """
+
+        connection = None
+        try:
+            while True:
+                item = await self._queue.get()
+                if item is None:
+                    break
+                if self._error is not None:
+                    continue
+                (body, triples) = item
+                try:
+                    connection = await asyncio.to_thread(self._post, connection, body)
+                    self.requests = self.requests + 1
+                    self.triples = self.triples + triples
+                except Exception as e:
+                    self._error = e if isinstance(e, SparqlUpdateError) else SparqlUpdateError(str(e))
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def _post(self, connection: http.client.HTTPConnection, body: bytes) -> http.client.HTTPConnection:
+        """
+        Posts the request, retrying after connection errors and 429 and 5xx
+        responses with exponential backoff. Runs in a worker thread.
+
+        Parameters
+        ----------
+        connection : http.client.HTTPConnection
+            Connection to reuse, a new one is opened if None.
+        body : bytes
+            UTF-8 encoded INSERT DATA request.
+
+        Returns
+        -------
+        http.client.HTTPConnection
+            Connection to reuse for the next request.
+
+        """
+
+        attempt = 0
+        while True:
+            error = None
+            try:
+                if connection is None:
+                    if self._url.scheme == 'https':
+                        connection = http.client.HTTPSConnection(self._url.netloc, timeout = self._timeout)
+                    else:
+                        connection = http.client.HTTPConnection(self._url.netloc, timeout = self._timeout)
+                connection.request('POST', self._path, body = body, headers = self._headers)
+                response = connection.getresponse()
+                content = response.read()
+                if 200 <= response.status < 300:
+                    return connection
+                error = f'SPARQL Update failed with {response.status} {response.reason}: {content[:200].decode("utf-8", "replace")}'
+                if response.status != 429 and response.status < 500:
+                    raise SparqlUpdateError(error)
+            except (OSError, http.client.HTTPException) as e:
+                error = f'SPARQL Update failed with {e.__class__.__name__}: {e}'
+                if connection is not None:
+                    connection.close()
+                connection = None
+            if attempt >= self._retries:
+                raise SparqlUpdateError(error)
+            time.sleep(self._backoff * 2 ** attempt)
+            attempt = attempt + 1
+
+async def to_sparql_update(df: pd.DataFrame, endpoint: str, namespace_manager: NamespaceManager = None, graph: URIRef = None,
+        chunk_size: int = 1000, **kwargs) -> int:
+    """
+    Takes Pandas DataFrame and inserts it into SPARQL Update endpoint in
+    chunks of rows using SparqlUpdateSink.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame to be inserted.
+    endpoint : str
+        URL of SPARQL Update endpoint.
+    namespace_manager : rdflib.namespace.NamespaceManager
+        NamespaceManager to use to normalize URIs
+    graph : rdflib.URIRef
+        Named graph to insert data into. Default graph if not provided.
+    chunk_size : int
+        Number of rows per INSERT DATA request.
+    **kwargs
+        Other parameters of SparqlUpdateSink.
+
+    Returns
+    -------
+    int
+        Number of inserted triples.
+
+    """
+
+    if chunk_size < 1:
+        raise ValueError(f'Chunk size must be positive but was {chunk_size}')
+
+    async with SparqlUpdateSink(endpoint, namespace_manager, graph, **kwargs) as sink:
+        for start in range(0, len(df), chunk_size):
+            await sink.send(df.iloc[start:start + chunk_size])
+
+    return sink.triples
+
+def _get_request(df: pd.DataFrame, prefixes: dict, graph: URIRef = None) -> tuple:
+    """
+    Converts DataFrame chunk into UTF-8 encoded INSERT DATA request.
+    Runs in a worker thread.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame chunk to be inserted.
+    prefixes : dict
+        Namespaces by prefix.
+    graph : rdflib.URIRef
+        Named graph to insert data into. Default graph if not provided.
+
+    Returns
+    -------
+    tuple
+        UTF-8 encoded INSERT DATA request, None if there are no triples,
+        and number of triples.
+
+    """
+
+    triples = list(_get_triples(df, prefixes))
+    if not triples:
+        return (None, 0)
+
+    return (_get_insert_data(triples, graph).encode('utf-8'), len(triples))
+
+def _get_insert_data(triples: list, graph: URIRef = None) -> str:
+    """
+    Creates SPARQL 1.1 INSERT DATA request for the triples.
+
+    Parameters
+    ----------
+    triples : list
+        Tuples of subject, predicate and object.
+    graph : rdflib.URIRef
+        Named graph to insert data into. Default graph if not provided.
+
+    Returns
+    -------
+    str
+        INSERT DATA request.
+
+    """
+
+    data = '\n'.join(f'{s.n3()} {p.n3()} {o.n3()} .' for (s, p, o) in triples)
+    if graph is not None:
+        data = f'GRAPH {URIRef(graph).n3()} {{\n{data}\n}}'
+
+    return f'INSERT DATA {{\n{data}\n}}'
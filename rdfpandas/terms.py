@@ -0,0 +1,565 @@
+# -*- coding: utf-8 -*-
+import heapq
+import operator
+import os
+import pickle
+import tempfile
+import numpy as np
+from rdflib import Graph, Literal, URIRef, BNode
+from rdflib.namespace import XSD
+from rdflib.term import Identifier
+
+_KINDS = (URIRef, BNode, Literal)
+
+_XSD_STRING = str(XSD.string)
+
+# Datatypes of Literals that rdfLib compares by value across datatypes
+_NUMERIC_DATATYPES = frozenset(XSD[name] for name in (
+    'integer', 'decimal', 'double', 'float', 'byte', 'int', 'long', 'negativeInteger',
+    'nonNegativeInteger', 'nonPositiveInteger', 'positiveInteger', 'short',
+    'unsignedByte', 'unsignedInt', 'unsignedLong', 'unsignedShort'))
+
+# Numeric Literals are sorted among other datatypes as xsd:decimal
+_XSD_NUMERIC = str(XSD.decimal)
+
+# Version of the saved files, changes whenever the rank order changes
+_VERSION = 4
+
+# Sort keys written to run files in one pickle
+_BATCH_SIZE = 10000
+
+class TermDictionary:
+    """
+    Maps rdfLib terms (URIRef, BNode and Literal) to dense integer ids.
+    Triples are stored as NumPy int64 arrays of term ids so that grouping,
+    counting and ordering can be done with NumPy rather than by hashing,
+    comparing and sorting rdfLib terms. Each term id also carries the id
+    of its "instance, datatype, language" tuple (idl) and its rank in the
+    rdfLib term order, so that conversions produce the same ordering as
+    sorting the terms themselves.
+    The same TermDictionary can be reused across conversions over the same
+    vocabulary and persisted with save() and load().
+
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._terms = []
+        self._idls = {}
+        self._idl_list = []
+        self._term_idls = []
+        self._ranks = None
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, term: Identifier) -> bool:
+        return term in self._ids
+
+    def encode(self, term: Identifier) -> int:
+        """
+        Returns id of the term, adding term to the dictionary if it was
+        not seen before.
+
+        Parameters
+        ----------
+        term : rdflib.term.Identifier
+            rdfLib Identifier (BNode, Literal or URIRef).
+
+        Returns
+        -------
+        int
+            Dense integer id of the term.
+
+        """
+
+        term_id = self._ids.get(term)
+        if term_id is None:
+            term_id = len(self._terms)
+            self._ids[term] = term_id
+            self._terms.append(term)
+            self._term_idls.append(self._get_idl_id(term))
+            self._ranks = None
+        return term_id
+
+    def _get_idl_id(self, term: Identifier) -> int:
+        """
+        Returns id of the instance, datatype and language tuple of the term,
+        adding the tuple if it was not seen before.
+
+        Parameters
+        ----------
+        term : rdflib.term.Identifier
+            rdfLib Identifier (BNode, Literal or URIRef).
+
+        Returns
+        -------
+        int
+            Id of the idl.
+
+        """
+
+        if isinstance(term, Literal):
+            idl = (Literal.__name__, term.datatype, term.language)
+        else:
+            idl = (term.__class__.__name__, None, None)
+        idl_id = self._idls.get(idl)
+        if idl_id is None:
+            idl_id = len(self._idl_list)
+            self._idls[idl] = idl_id
+            self._idl_list.append(idl)
+        return idl_id
+
+    def encode_triples(self, triples) -> np.ndarray:
+        """
+        Encodes an iterable of triples into an array of term ids.
+
+        Parameters
+        ----------
+        triples : iterable
+            Iterable of (subject, predicate, object) tuples,
+            for example rdflib.Graph.triples((None, None, None)).
+
+        Returns
+        -------
+        numpy.ndarray
+            int64 array of shape (n, 3) with ids of subjects, predicates
+            and objects in iteration order.
+
+        """
+
+        ids = self._ids
+        encode = self.encode
+        encoded = []
+        append = encoded.append
+        for triple in triples:
+            for term in triple:
+                term_id = ids.get(term)
+                append(encode(term) if term_id is None else term_id)
+
+        return np.array(encoded, dtype = np.int64).reshape(-1, 3)
+
+    def encode_quads(self, quads) -> np.ndarray:
+        """
+        Encodes an iterable of quads into an array of term ids.
+        Graphs are encoded by their identifiers.
+
+        Parameters
+        ----------
+        quads : iterable
+            Iterable of (subject, predicate, object, graph) tuples,
+            for example rdflib.Dataset.quads((None, None, None, None)).
+
+        Returns
+        -------
+        numpy.ndarray
+            int64 array of shape (n, 4) with ids of subjects, predicates,
+            objects and graph identifiers in iteration order.
+
+        """
+
+        ids = self._ids
+        encode = self.encode
+        encoded = []
+        append = encoded.append
+        for (s, p, o, c) in quads:
+            if isinstance(c, Graph):
+                c = c.identifier
+            for term in (s, p, o, c):
+                term_id = ids.get(term)
+                append(encode(term) if term_id is None else term_id)
+
+        return np.array(encoded, dtype = np.int64).reshape(-1, 4)
+
+    def encode_terms(self, terms) -> np.ndarray:
+        """
+        Encodes an iterable of terms into an array of term ids.
+        None, for example unbound variable in query results, is encoded as -1.
+
+        Parameters
+        ----------
+        terms : iterable
+            Iterable of rdfLib Identifiers or None.
+
+        Returns
+        -------
+        numpy.ndarray
+            int64 array of term ids in iteration order.
+
+        """
+
+        ids = self._ids
+        encode = self.encode
+        encoded = []
+        append = encoded.append
+        for term in terms:
+            if term is None:
+                append(-1)
+            else:
+                term_id = ids.get(term)
+                append(encode(term) if term_id is None else term_id)
+
+        return np.array(encoded, dtype = np.int64)
+
+    def decode(self, term_id: int) -> Identifier:
+        """
+        Returns term for the id.
+
+        Parameters
+        ----------
+        term_id : int
+            Id of the term.
+
+        Returns
+        -------
+        rdflib.term.Identifier
+            rdfLib Identifier (BNode, Literal or URIRef).
+
+        """
+
+        return self._terms[term_id]
+
+    def idl(self, idl_id: int) -> tuple:
+        """
+        Returns tuple of instance name (Literal, URIRef or BNode),
+        datatype and language for the idl id.
+
+        Parameters
+        ----------
+        idl_id : int
+            Id of the instance, datatype and language tuple.
+
+        Returns
+        -------
+        tuple
+            tuple of instance, datatype and language.
+
+        """
+
+        return self._idl_list[idl_id]
+
+    def idls(self) -> np.ndarray:
+        """
+        Returns ids of instance, datatype and language tuples indexed by term id.
+
+        Returns
+        -------
+        numpy.ndarray
+            int64 array of idl ids.
+
+        """
+
+        return np.array(self._term_idls, dtype = np.int64)
+
+    def ranks(self, run_size: int = None, directory: str = None) -> np.ndarray:
+        """
+        Returns position of every term in the rdfLib term order, indexed
+        by term id. Terms are only sorted once per dictionary and the
+        result is kept until new terms are added.
+        Terms are sorted on keys that give the rdfLib term order: BNodes,
+        URIRefs and string Literals are sorted by their strings and other
+        Literals by datatype and then using rdfLib comparisons.
+        If run_size is provided, keys are sorted in runs of run_size terms
+        that are written to temporary files and merged, so that only one
+        run of keys is in memory at a time.
+
+        Parameters
+        ----------
+        run_size : int
+            Number of terms to sort in memory at a time. All terms are
+            sorted in memory if not provided.
+        directory : str
+            Directory for temporary run files. Default temporary directory
+            if not provided.
+
+        Returns
+        -------
+        numpy.ndarray
+            int64 array of ranks.
+
+        """
+
+        if self._ranks is None:
+            terms = self._terms
+            if run_size is None:
+                order = sorted(range(len(terms)), key = lambda term_id: _get_sort_key(terms[term_id]))
+                ranks = np.empty(len(order), dtype = np.int64)
+                ranks[np.array(order, dtype = np.int64)] = np.arange(len(order), dtype = np.int64)
+            else:
+                ranks = _get_external_ranks(terms, run_size, directory)
+            self._ranks = ranks
+        return self._ranks
+
+    def save(self, path: str):
+        """
+        Saves the dictionary into a directory of NumPy .npy files that
+        can be memory-mapped by load().
+
+        Parameters
+        ----------
+        path : str
+            Directory to save the dictionary to. Created if it does not exist.
+
+        """
+
+        kinds = np.empty(len(self._terms), dtype = np.int8)
+        values = []
+        datatypes = []
+        languages = []
+        for term_id, term in enumerate(self._terms):
+            if not isinstance(term, _KINDS):
+                raise ValueError(f'Can only save Literal, URIRef or BNode but was {term.__class__.__name__}')
+            for kind, cls in enumerate(_KINDS):
+                if isinstance(term, cls):
+                    kinds[term_id] = kind
+                    break
+            values.append(str(term))
+            if isinstance(term, Literal):
+                datatypes.append(str(term.datatype) if term.datatype else '')
+                languages.append(term.language or '')
+            else:
+                datatypes.append('')
+                languages.append('')
+
+        os.makedirs(path, exist_ok = True)
+        np.save(os.path.join(path, 'version.npy'), np.array([_VERSION], dtype = np.int64))
+        np.save(os.path.join(path, 'kinds.npy'), kinds)
+        np.save(os.path.join(path, 'ranks.npy'), self.ranks())
+        np.save(os.path.join(path, 'idls.npy'), self.idls())
+        _save_strings(path, 'values', values)
+        _save_strings(path, 'datatypes', datatypes)
+        _save_strings(path, 'languages', languages)
+        _save_strings(path, 'idl_instances', [idl[0] for idl in self._idl_list])
+        _save_strings(path, 'idl_datatypes', [str(idl[1]) if idl[1] else '' for idl in self._idl_list])
+        _save_strings(path, 'idl_languages', [idl[2] or '' for idl in self._idl_list])
+
+    @classmethod
+    def load(cls, path: str) -> 'TermDictionary':
+        """
+        Loads the dictionary saved by save(). Files are memory-mapped and
+        term ids and ranks are the same as in the saved dictionary.
+        Terms are created directly from the saved strings and idls,
+        without encoding them again. Ranks saved by a different version
+        are recomputed when they are first needed.
+
+        Parameters
+        ----------
+        path : str
+            Directory the dictionary was saved to.
+
+        Returns
+        -------
+        TermDictionary
+            Loaded dictionary.
+
+        """
+
+        td = cls()
+        version_path = os.path.join(path, 'version.npy')
+        version = int(np.load(version_path)[0]) if os.path.exists(version_path) else 1
+        kinds = np.load(os.path.join(path, 'kinds.npy'), mmap_mode = 'r')
+        values = _load_strings(path, 'values')
+        datatypes = _load_strings(path, 'datatypes')
+        languages = _load_strings(path, 'languages')
+
+        terms = []
+        append = terms.append
+        for kind, value, datatype, language in zip(kinds.tolist(), values, datatypes, languages):
+            term_class = _KINDS[kind]
+            if term_class is Literal:
+                append(Literal(value, datatype = URIRef(datatype) if datatype else None, lang = language or None, normalize = False))
+            else:
+                append(term_class(value))
+        td._terms = terms
+        td._ids = dict(zip(terms, range(len(terms))))
+
+        if version >= 2:
+            instances = _load_strings(path, 'idl_instances')
+            idl_datatypes = _load_strings(path, 'idl_datatypes')
+            idl_languages = _load_strings(path, 'idl_languages')
+            td._idl_list = [(instance, URIRef(datatype) if datatype else None, language or None)
+                for (instance, datatype, language) in zip(instances, idl_datatypes, idl_languages)]
+            td._idls = dict(zip(td._idl_list, range(len(td._idl_list))))
+            td._term_idls = np.load(os.path.join(path, 'idls.npy')).tolist()
+        else:
+            td._term_idls = [td._get_idl_id(term) for term in terms]
+
+        if version == _VERSION:
+            td._ranks = np.load(os.path.join(path, 'ranks.npy'), mmap_mode = 'r')
+
+        return td
+
+def _get_sort_key(term: Identifier) -> tuple:
+    """
+    Creates key that sorts terms in the rdfLib term order: BNodes, URIRefs
+    and then Literals by datatype, with plain and language tagged Literals
+    as xsd:string. Literals with the same datatype are sorted by language
+    and value for strings and using rdfLib comparisons otherwise.
+    Numeric Literals are sorted by value across datatypes, as rdfLib does,
+    with NaN after all other values, and are placed among other datatypes
+    as xsd:decimal. Literals equal in value are sorted by datatype and
+    lexical form, and plain before xsd:string, so that the order is total
+    and does not depend on the order of the terms being sorted.
+
+    Parameters
+    ----------
+    term : rdflib.term.Identifier
+        rdfLib Identifier (BNode, Literal or URIRef).
+
+    Returns
+    -------
+    tuple
+        Sort key of the term.
+
+    """
+
+    if not isinstance(term, Literal):
+        return (0, 0 if isinstance(term, BNode) else 1, str(term))
+    if term.datatype is None or term.datatype == XSD.string:
+        return (1, _XSD_STRING, term.language is not None, term.language or '', str(term), term.datatype is not None)
+    if term.datatype in _NUMERIC_DATATYPES and not term.ill_typed and term.value is not None:
+        # NaN is not equal to itself and not ordered with other values
+        nan = term.value != term.value
+        return (1, _XSD_NUMERIC, 0, (nan, 0 if nan else term.value, str(term.datatype), str(term)))
+
+    return (1, str(term.datatype), 1, _LiteralKey(term))
+
+class _LiteralKey:
+    """
+    Sort key of a Literal that compares Literals using rdfLib comparisons
+    and Literals that are equal in value, for example "1.0"^^xsd:decimal
+    and "1.00"^^xsd:decimal, by their lexical form.
+    The Literal can not be a tuple element of the key itself, as tuples
+    stop comparing at the first elements that are not equal terms.
+
+    """
+
+    __slots__ = ('literal',)
+
+    def __init__(self, literal: Literal):
+        self.literal = literal
+
+    def __eq__(self, other: '_LiteralKey') -> bool:
+        return self.literal == other.literal
+
+    def __lt__(self, other: '_LiteralKey') -> bool:
+        try:
+            if self.literal < other.literal:
+                return True
+            if other.literal < self.literal:
+                return False
+        except TypeError:
+            pass
+        return str(self.literal) < str(other.literal)
+
+def _get_external_ranks(terms: list, run_size: int, directory: str = None) -> np.ndarray:
+    """
+    Sorts terms by _get_sort_key in runs written to temporary files,
+    merges the runs and returns position of every term in the order.
+    Terms with equal keys keep the order of their ids.
+
+    Parameters
+    ----------
+    terms : list
+        Terms indexed by term id.
+    run_size : int
+        Number of terms to sort in memory at a time.
+    directory : str
+        Directory for temporary run files.
+
+    Returns
+    -------
+    numpy.ndarray
+        int64 array of ranks indexed by term id.
+
+    """
+
+    if run_size < 1:
+        raise ValueError(f'Run size must be positive but was {run_size}')
+
+    ranks = np.empty(len(terms), dtype = np.int64)
+    key = operator.itemgetter(0)
+
+    with tempfile.TemporaryDirectory(dir = directory, prefix = 'rdfpandas-') as runs_directory:
+        runs = []
+        for start in range(0, len(terms), run_size):
+            run = sorted(((_get_sort_key(terms[term_id]), term_id) for term_id in range(start, min(start + run_size, len(terms)))), key = key)
+            path = os.path.join(runs_directory, f'{len(runs)}.pickle')
+            with open(path, 'wb') as f:
+                for batch_start in range(0, len(run), _BATCH_SIZE):
+                    pickle.dump(run[batch_start:batch_start + _BATCH_SIZE], f, protocol = pickle.HIGHEST_PROTOCOL)
+            runs.append(path)
+
+        for (rank, (_, term_id)) in enumerate(heapq.merge(*(_read_run(path) for path in runs), key = key)):
+            ranks[term_id] = rank
+
+    return ranks
+
+def _read_run(path: str):
+    """
+    Reads sorted keys and term ids written by _get_external_ranks.
+
+    Parameters
+    ----------
+    path : str
+        Path of the run file.
+
+    Returns
+    -------
+    generator
+        Tuples of sort key and term id.
+
+    """
+
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
+
+def _save_strings(path: str, name: str, strings: list):
+    """
+    Saves list of strings as a UTF-8 buffer and offsets into the buffer.
+
+    Parameters
+    ----------
+    path : str
+        Directory to save strings to.
+    name : str
+        Name of the files to use.
+    strings : list
+        Strings to save.
+
+    """
+
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype = np.int64)
+    np.cumsum([len(e) for e in encoded], out = offsets[1:])
+    np.save(os.path.join(path, f'{name}.npy'), np.frombuffer(b''.join(encoded), dtype = np.uint8))
+    np.save(os.path.join(path, f'{name}_offsets.npy'), offsets)
+
+def _load_strings(path: str, name: str) -> list:
+    """
+    Loads list of strings saved by _save_strings.
+
+    Parameters
+    ----------
+    path : str
+        Directory to load strings from.
+    name : str
+        Name of the files to use.
+
+    Returns
+    -------
+    list
+        Loaded strings.
+
+    """
+
+    buffer = np.load(os.path.join(path, f'{name}.npy'), mmap_mode = 'r')
+    offsets = np.load(os.path.join(path, f'{name}_offsets.npy')).tolist()
+    data = memoryview(buffer)
+
+    return [str(data[start:end], 'utf-8') for (start, end) in zip(offsets[:-1], offsets[1:])]
@@ -19,6 +19,12 @@ setup(
     url = 'https://github.com/cadmiumkitty/rdfpandas',
     license = 'MIT',
     packages = find_packages(exclude = ('tests', 'docs')),
-    install_requires = ['pandas>=2.2.2', 'rdflib>=6.3.2']
+    install_requires = ['pandas>=2.2.2', 'rdflib>=6.3.2'],
+    extras_require = {
+        'parquet': ['pyarrow']
+    },
+    entry_points = {
+        'console_scripts': ['rdfpandas = rdfpandas.cli:main']
+    }
 )
 
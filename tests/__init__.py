@@ -1 +1,6 @@
-from .test_graph import ConversionTestCase
\ No newline at end of file
+from .test_cache import ConversionCacheTestCase
+from .test_cli import CommandLineTestCase
+from .test_graph import ConversionTestCase
+from .test_query import SelectConversionTestCase
+from .test_sparql import SparqlUpdateTestCase
+from .test_terms import TermDictionaryTestCase
\ No newline at end of file
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+from .context import rdfpandas
+
+import pandas as pd
+
+from rdflib import Graph, Literal, URIRef, Namespace
+from rdflib.namespace import NamespaceManager, SKOS
+from rdfpandas.cache import ConversionCache, _write_dataframe, _read_dataframe
+import rdflib.compare
+
+import importlib.util
+import os
+import tempfile
+import unittest
+
+
+class ConversionCacheTestCase(unittest.TestCase):
+    """Tests caching of conversion results on disk"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.g = Graph()
+        self.g.parse('./tests/rdf/test.ttl', format = 'ttl')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_should_cache_graph_to_data_frame(self):
+        """Should return the same DataFrame from cache for the same triples and namespaces
+        """
+
+        cache = ConversionCache(self.directory.name)
+        df_expected = rdfpandas.to_dataframe(self.g)
+
+        df_result_cold = cache.to_dataframe(self.g)
+        g = Graph()
+        g.parse('./tests/rdf/test.ttl', format = 'ttl')
+        df_result_warm = cache.to_dataframe(g)
+
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        pd.testing.assert_frame_equal(df_expected, df_result_cold)
+        pd.testing.assert_frame_equal(df_expected, df_result_warm)
+
+    def test_should_cache_graph_to_data_frame_for_any_term_dictionary(self):
+        """Should hit the cache when each call passes its own TermDictionary
+        """
+
+        cache = ConversionCache(self.directory.name)
+
+        df_result_cold = cache.to_dataframe(self.g, term_dictionary = rdfpandas.TermDictionary())
+        df_result_warm = cache.to_dataframe(self.g, term_dictionary = rdfpandas.TermDictionary())
+
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        pd.testing.assert_frame_equal(df_result_cold, df_result_warm)
+
+    def test_should_cache_graph_to_data_frame_in_order(self):
+        """Should hit the cache for triples in any order only with canonical order and for the same TermDictionary terms with order none
+        """
+
+        # SimpleMemory returns triples in the order they were added
+        g_reversed = Graph(store = 'SimpleMemory')
+        g_reversed.namespace_manager = self.g.namespace_manager
+        for triple in reversed(list(self.g)):
+            g_reversed.add(triple)
+        cache = ConversionCache(self.directory.name)
+
+        cache.to_dataframe(self.g, order = 'canonical')
+        cache.to_dataframe(g_reversed, order = 'canonical')
+        cache.to_dataframe(self.g)
+        df_result = cache.to_dataframe(g_reversed)
+
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        pd.testing.assert_frame_equal(df_result, rdfpandas.to_dataframe(g_reversed))
+
+        g = Graph()
+        for o in ('a', 'b'):
+            g.add((URIRef('http://github.com/cadmiumkitty/rdfpandas/one'),
+                            URIRef('http://github.com/cadmiumkitty/rdfpandas/string'),
+                            Literal(o)))
+        td = rdfpandas.TermDictionary()
+        td.encode(Literal('b'))
+
+        cache.to_dataframe(g, order = 'none', term_dictionary = rdfpandas.TermDictionary())
+        df_result = cache.to_dataframe(g, order = 'none', term_dictionary = td)
+
+        self.assertEqual((cache.hits, cache.misses), (1, 5))
+        pd.testing.assert_frame_equal(df_result, rdfpandas.to_dataframe(g, order = 'none', term_dictionary = td))
+
+    def test_should_keep_string_storage_of_cached_data_frame(self):
+        """Should read back string columns and index with the storage they were written with
+        """
+
+        for storage in ('python', 'pyarrow'):
+            if storage == 'pyarrow' and importlib.util.find_spec('pyarrow') is None:
+                continue
+            dtype = pd.StringDtype(storage)
+            df = pd.DataFrame({'rdfpandas:string{Literal}': pd.array(['String 1', None], dtype = dtype)},
+                index = pd.Index(['rdfpandas:one', 'rdfpandas:two'], dtype = dtype))
+            path = os.path.join(self.directory.name, f'test-{storage}')
+
+            extension = _write_dataframe(df, path)
+            os.replace(path, f'{path}{extension}')
+            df_result = _read_dataframe(f'{path}{extension}')
+
+            self.assertEqual(df_result['rdfpandas:string{Literal}'].dtype.storage, storage)
+            self.assertEqual(df_result.index.dtype.storage, storage)
+            pd.testing.assert_frame_equal(df, df_result)
+
+    def test_should_not_reuse_cache_for_changed_graph(self):
+        """Should convert again when triples or namespace bindings change
+        """
+
+        cache = ConversionCache(self.directory.name)
+        cache.to_dataframe(self.g)
+
+        self.g.add((URIRef('http://github.com/cadmiumkitty/rdfpandas/three'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/string'), 
+                        Literal('String 3')))
+        df_result = cache.to_dataframe(self.g)
+        self.g.bind('rp', Namespace('http://github.com/cadmiumkitty/rdfpandas/'), override = True, replace = True)
+        cache.to_dataframe(self.g)
+
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        self.assertEqual(len(df_result), 3)
+
+    def test_should_cache_data_frame_to_graph(self):
+        """Should return the same Graph from cache for the same DataFrame and namespaces
+        """
+
+        df = pd.read_csv('./tests/csv/test.csv', index_col = '@id')
+        namespace_manager = NamespaceManager(Graph())
+        namespace_manager.bind('skos', SKOS)
+        namespace_manager.bind('rdfpandas', Namespace('http://github.com/cadmiumkitty/rdfpandas/'))
+        cache = ConversionCache(self.directory.name)
+
+        cache.to_graph(df, namespace_manager)
+        g_result = cache.to_graph(df.copy(), namespace_manager)
+        df.iloc[0, 0] = 'skos:narrower'
+        cache.to_graph(df, namespace_manager)
+
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertEqual(rdflib.compare.isomorphic(self.g, g_result), True)
+        self.assertEqual(g_result.namespace_manager.store.namespace('rdfpandas'), URIRef('http://github.com/cadmiumkitty/rdfpandas/'))
+
+    def test_should_not_reuse_cache_for_values_of_other_types(self):
+        """Should convert again when object values only differ in their types
+        """
+
+        df = pd.DataFrame({'rdfpandas:value': pd.Series([1, 'x'], index = ['rdfpandas:one', 'rdfpandas:two'], dtype = object)})
+        df_strings = pd.DataFrame({'rdfpandas:value': pd.Series(['1', 'x'], index = ['rdfpandas:one', 'rdfpandas:two'], dtype = object)})
+        namespace_manager = NamespaceManager(Graph())
+        namespace_manager.bind('rdfpandas', Namespace('http://github.com/cadmiumkitty/rdfpandas/'))
+        cache = ConversionCache(self.directory.name)
+
+        cache.to_graph(df, namespace_manager)
+        g_result = cache.to_graph(df_strings, namespace_manager)
+
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+        self.assertEqual(rdflib.compare.isomorphic(rdfpandas.to_graph(df_strings, namespace_manager), g_result), True)
+        self.assertIn(Literal('1'), set(g_result.objects()))
+
+    def test_should_evict_least_recently_used(self):
+        """Should remove least recently used results over maximum size
+        """
+
+        cache = ConversionCache(self.directory.name)
+        g = Graph()
+        g.add((URIRef('http://github.com/cadmiumkitty/rdfpandas/one'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/string'), 
+                        Literal('String 1')))
+        cache.to_dataframe(g)
+        (small,) = os.listdir(self.directory.name)
+        cache.to_dataframe(self.g)
+        (large,) = set(os.listdir(self.directory.name)) - set([small])
+        os.utime(os.path.join(self.directory.name, small), (100, 100))
+        os.utime(os.path.join(self.directory.name, large), (200, 200))
+
+        cache.to_dataframe(g)
+        cache.max_bytes = os.path.getsize(os.path.join(self.directory.name, small))
+        cache._evict()
+
+        self.assertEqual(os.listdir(self.directory.name), [small])
+        cache.to_dataframe(self.g)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+from .context import rdfpandas
+
+import pandas as pd
+import numpy as np
+
+from rdflib import Graph
+from rdfpandas.cli import main
+import rdflib.compare
+
+import contextlib
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+
+
+class CommandLineTestCase(unittest.TestCase):
+    """Tests command line conversion between DataFrame and Graph files"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.prefixes = [
+            '--prefix', 'rdfpandas=http://github.com/cadmiumkitty/rdfpandas/',
+            '--prefix', 'skos=http://www.w3.org/2004/02/skos/core#']
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_should_roundtrip_csv_to_turtle_to_csv(self):
+        """Should roundtrip CSV -> Turtle -> CSV converting chunks in worker processes
+        """
+
+        self.assertEqual(main(['./tests/csv/test.csv', self.path('test.ttl'), '--chunk-size', '1', '--workers', '2', '--quiet'] + self.prefixes), 0)
+        self.assertEqual(main([self.path('test.ttl'), self.path('test.csv'), '--quiet'] + self.prefixes), 0)
+
+        g_expected = Graph()
+        g_expected.parse('./tests/rdf/test.ttl', format = 'ttl')
+        g_result = Graph()
+        g_result.parse(self.path('test.ttl'), format = 'ttl')
+
+        df = pd.read_csv('./tests/csv/test.csv', index_col = '@id')
+        df_result = pd.read_csv(self.path('test.csv'), index_col = '@id')
+
+        self.assertEqual(rdflib.compare.isomorphic(g_expected, g_result), True)
+        pd.testing.assert_frame_equal(df.astype(np.str_), df_result.astype(np.str_), check_like = True)
+
+    def test_should_convert_csv_to_n_triples(self):
+        """Should write N-Triples in a single process
+        """
+
+        self.assertEqual(main(['./tests/csv/test.csv', self.path('test.nt'), '--workers', '1', '--quiet'] + self.prefixes), 0)
+
+        g_expected = Graph()
+        g_expected.parse('./tests/rdf/test.ttl', format = 'ttl')
+        g_result = Graph()
+        g_result.parse(self.path('test.nt'), format = 'nt')
+
+        self.assertEqual(rdflib.compare.isomorphic(g_expected, g_result), True)
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'requires pyarrow')
+    def test_should_roundtrip_turtle_to_parquet_to_turtle(self):
+        """Should roundtrip Turtle -> Parquet -> Turtle
+        """
+
+        self.assertEqual(main(['./tests/rdf/test.ttl', self.path('test.parquet'), '--quiet'] + self.prefixes), 0)
+        self.assertEqual(main([self.path('test.parquet'), self.path('test.ttl'), '--chunk-size', '1', '--quiet'] + self.prefixes), 0)
+
+        g_expected = Graph()
+        g_expected.parse('./tests/rdf/test.ttl', format = 'ttl')
+        g_result = Graph()
+        g_result.parse(self.path('test.ttl'), format = 'ttl')
+
+        self.assertEqual(rdflib.compare.isomorphic(g_expected, g_result), True)
+
+    def test_should_convert_chunks_independent_of_chunk_size(self):
+        """Should write the same literals for any chunk size when a column has empty cells
+        """
+
+        with open(self.path('test.csv'), 'w', encoding = 'utf-8') as f:
+            f.write('@id,rdfpandas:integer{Literal}(xsd:integer)\nrdfpandas:one,1\nrdfpandas:two,\nrdfpandas:three,3\n')
+
+        graphs = []
+        for chunk_size in ('1', '2', '10'):
+            self.assertEqual(main([self.path('test.csv'), self.path(f'test{chunk_size}.nt'), '--chunk-size', chunk_size, '--workers', '1', '--quiet'] + self.prefixes), 0)
+            g = Graph()
+            g.parse(self.path(f'test{chunk_size}.nt'), format = 'nt')
+            graphs.append(set(g))
+
+        self.assertEqual(graphs[0], graphs[1])
+        self.assertEqual(graphs[0], graphs[2])
+        self.assertEqual(sorted(str(o) for (_, _, o) in graphs[0]), ['1', '3'])
+
+    def test_should_keep_blank_nodes_across_turtle_chunks(self):
+        """Should write blank nodes with labels so that chunks share them in Turtle
+        """
+
+        with open(self.path('test.csv'), 'w', encoding = 'utf-8') as f:
+            f.write('@id,rdfpandas:bnode{BNode}\nrdfpandas:one,node\nrdfpandas:two,node\n')
+
+        self.assertEqual(main([self.path('test.csv'), self.path('test.ttl'), '--chunk-size', '1', '--workers', '1', '--quiet'] + self.prefixes), 0)
+        g = Graph()
+        g.parse(self.path('test.ttl'), format = 'ttl')
+
+        self.assertEqual(len(g), 2)
+        self.assertEqual(len(set(g.objects())), 1)
+
+    def test_should_keep_output_for_missing_input(self):
+        """Should exit with error and leave existing output unchanged when input can not be read
+        """
+
+        for (input_name, output_name) in (('missing.csv', 'test.ttl'), ('missing.ttl', 'test.csv')):
+            with open(self.path(output_name), 'w', encoding = 'utf-8') as f:
+                f.write('previous')
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                self.assertEqual(main([self.path(input_name), self.path(output_name), '--workers', '1', '--quiet'] + self.prefixes), 1)
+
+            self.assertIn('rdfpandas: error:', stderr.getvalue())
+            with open(self.path(output_name), encoding = 'utf-8') as f:
+                self.assertEqual(f.read(), 'previous')
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ['test.csv', 'test.ttl'])
+
+    def test_should_reject_unsupported_conversion(self):
+        """Should exit with error for unknown formats and conversions between the same kind of files
+        """
+
+        with self.assertRaises(SystemExit):
+            main(['./tests/csv/test.csv', self.path('test.txt'), '--quiet'])
+        with self.assertRaises(SystemExit):
+            main(['./tests/csv/test.csv', self.path('test.csv'), '--quiet'])
+        with self.assertRaises(SystemExit):
+            main(['./tests/csv/test.csv', self.path('test.ttl'), '--prefix', 'skos', '--quiet'])
+
+
+if __name__ == '__main__':
+    unittest.main()
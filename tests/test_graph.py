@@ -5,10 +5,15 @@ from .context import rdfpandas
 import pandas as pd
 import numpy as np
 
-from rdflib import Graph, Literal, URIRef, BNode, Namespace
+from rdflib import Graph, Dataset, Literal, URIRef, BNode, Namespace
 from rdflib.term import Identifier
 from rdflib.namespace import NamespaceManager, SKOS, XSD
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
 import rdflib.compare
+import importlib.util
+import io
+import os
+import tempfile
 
 import unittest
 
@@ -243,6 +248,72 @@ class ConversionTestCase(unittest.TestCase):
         
         self.assertEqual(rdflib.compare.isomorphic(g_expected, g_result), True)        
 
+    def test_should_add_data_frame_to_existing_graph_in_batches(self):
+        """Should add triples to existing Graph keeping existing triples.
+        """
+
+        ds1 = pd.Series(data = ['String 1', 'String 2', 'String 3'], index = ['rdfpandas:one', 'rdfpandas:two', 'rdfpandas:three'], dtype = np.str_)
+        ds2 = pd.Series(data = ['skos:broader', np.nan, 'skos:narrower'], index = ['rdfpandas:one', 'rdfpandas:two', 'rdfpandas:three'], dtype = np.str_)
+
+        df = pd.DataFrame({
+            'rdfpandas:string{Literal}': ds1,
+            'rdfpandas:curie{URIRef}': ds2
+            })
+
+        g = Graph()
+        g.bind('rdfpandas', Namespace('http://github.com/cadmiumkitty/rdfpandas/'))
+        g.add((URIRef('http://github.com/cadmiumkitty/rdfpandas/zero'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/string'),
+                        Literal('String 0')))
+
+        g_expected = Graph()
+        g_expected += g
+        for (s, o) in [('one', 'String 1'), ('two', 'String 2'), ('three', 'String 3')]:
+            g_expected.add((URIRef(f'http://github.com/cadmiumkitty/rdfpandas/{s}'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/string'),
+                        Literal(o)))
+        g_expected.add((URIRef('http://github.com/cadmiumkitty/rdfpandas/one'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/curie'),
+                        SKOS.broader))
+        g_expected.add((URIRef('http://github.com/cadmiumkitty/rdfpandas/three'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/curie'),
+                        SKOS.narrower))
+
+        g_result = rdfpandas.to_graph(df, graph = g, batch_size = 2)
+
+        self.assertIs(g_result, g)
+        self.assertEqual(rdflib.compare.isomorphic(g_expected, g_result), True)
+
+    def test_should_add_data_frame_to_dataset_context(self):
+        """Should add triples to the named graph of Dataset.
+        """
+
+        ds1 = pd.Series(data = ['String 1'], index = ['http://github.com/cadmiumkitty/rdfpandas/one'], dtype = np.str_)
+        df = pd.DataFrame({'http://github.com/cadmiumkitty/rdfpandas/string{Literal}': ds1})
+
+        d = Dataset()
+        d_result = rdfpandas.to_graph(df, graph = d, context = URIRef('http://github.com/cadmiumkitty/rdfpandas/graph'))
+        rdfpandas.to_graph(df, graph = d)
+
+        triples = set([(URIRef('http://github.com/cadmiumkitty/rdfpandas/one'), 
+            URIRef('http://github.com/cadmiumkitty/rdfpandas/string'), 
+            Literal('String 1'))])
+
+        self.assertEqual(set(d_result.graph(URIRef('http://github.com/cadmiumkitty/rdfpandas/graph'))), triples)
+        self.assertEqual(set(d_result.graph(DATASET_DEFAULT_GRAPH_ID)), triples)
+        self.assertEqual(len(d_result), 1)
+
+    def test_should_reject_context_for_graph(self):
+        """Should raise ValueError for context of a Graph and for batch size that is not positive.
+        """
+
+        df = pd.DataFrame()
+
+        with self.assertRaises(ValueError):
+            rdfpandas.to_graph(df, graph = Graph(), context = URIRef('http://github.com/cadmiumkitty/rdfpandas/graph'))
+        with self.assertRaises(ValueError):
+            rdfpandas.to_graph(df, batch_size = 0)
+
 
     def test_should_convert_empty_graph_to_empty_data_frame(self):
         """Should return empty DataFrame for empty Graph
@@ -381,5 +452,197 @@ class ConversionTestCase(unittest.TestCase):
         self.assertEqual(rdflib.compare.isomorphic(g, g_result), True)
 
 
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'requires pyarrow')
+    def test_should_convert_graph_to_data_frame_with_arrow_strings(self):
+        """Should return DataFrame with string[pyarrow] columns and index aligned as object DataFrame
+        """
+
+        g = rdflib.Graph()
+        g.parse('./tests/rdf/test.ttl', format = 'ttl')
+        df_expected = rdfpandas.to_dataframe(g)
+
+        df_result = rdfpandas.to_dataframe(g, string_storage = 'pyarrow')
+
+        self.assertEqual([str(dtype) for dtype in df_result.dtypes], ['string'] * len(df_expected.columns))
+        self.assertIsInstance(df_result.index.array, pd.arrays.ArrowStringArray)
+        pd.testing.assert_frame_equal(df_expected.astype('string[pyarrow]').set_axis(df_expected.index.astype('string[pyarrow]')), df_result)
+        self.assertEqual(df_expected.to_csv(), df_result.to_csv())
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'requires pyarrow')
+    def test_should_convert_dataset_to_data_frame_with_arrow_strings(self):
+        """Should return DataFrame with string[pyarrow] columns and index levels for Dataset
+        """
+
+        g = rdflib.Graph()
+        g.parse('./tests/rdf/test.ttl', format = 'ttl')
+        d = Dataset()
+        d.namespace_manager = g.namespace_manager
+        for (i, triple) in enumerate(g):
+            d.graph(URIRef(f'http://github.com/cadmiumkitty/rdfpandas/graph{i % 2}')).add(triple)
+
+        df_expected = rdfpandas.dataset_to_dataframe(d)
+        df_result = rdfpandas.dataset_to_dataframe(d, string_storage = 'pyarrow')
+
+        self.assertEqual([str(dtype) for dtype in df_result.index.dtypes], ['string', 'string'])
+        self.assertEqual(list(df_expected.index), list(df_result.index))
+        self.assertEqual(df_expected.to_csv(), df_result.to_csv())
+
+    def test_should_reject_unknown_string_storage(self):
+        """Should raise ValueError for string storage other than None or pyarrow
+        """
+
+        with self.assertRaises(ValueError):
+            rdfpandas.to_dataframe(rdflib.Graph(), string_storage = 'arrow')
+
+    def test_should_convert_graph_to_data_frame_in_order(self):
+        """Should return the same CSV for triples in any iteration order with canonical order, the same CSV with stable and external order and the same triples with none
+        """
+
+        g = rdflib.Graph()
+        g.parse('./tests/rdf/test.ttl', format = 'ttl')
+        # SimpleMemory returns triples in the order they were added
+        g_reversed = rdflib.Graph(store = 'SimpleMemory')
+        g_reversed.namespace_manager = g.namespace_manager
+        for triple in reversed(list(g)):
+            g_reversed.add(triple)
+
+        csv = rdfpandas.to_dataframe(g, order = 'canonical').to_csv()
+        self.assertEqual(rdfpandas.to_dataframe(g_reversed, order = 'canonical').to_csv(), csv)
+
+        for graph in (g, g_reversed):
+            self.assertEqual(rdfpandas.to_dataframe(graph, order = 'external').to_csv(), rdfpandas.to_dataframe(graph).to_csv())
+
+        with tempfile.TemporaryDirectory() as path:
+            self.assertEqual(rdfpandas.to_dataframe(g, order = 'external', run_size = 1, directory = path).to_csv(), rdfpandas.to_dataframe(g).to_csv())
+            self.assertEqual(os.listdir(path), [])
+
+        df_result = rdfpandas.to_dataframe(g_reversed, order = 'none')
+        self.assertEqual(rdflib.compare.isomorphic(rdfpandas.to_graph(df_result, g.namespace_manager), g), True)
+
+        with self.assertRaises(ValueError):
+            rdfpandas.to_dataframe(g, order = 'sorted')
+        with self.assertRaises(ValueError):
+            rdfpandas.to_dataframe(g, order = 'external', run_size = 0)
+
+    def test_should_round_trip_csv_in_canonical_order(self):
+        """Should return byte-identical CSV after CSV -> Graph -> CSV round trip reading strings with canonical order
+        """
+
+        rdfpandas_namespace = Namespace('http://github.com/cadmiumkitty/rdfpandas/')
+        g = Graph()
+        g.bind('rdfpandas', rdfpandas_namespace)
+        g.add((rdfpandas_namespace.one, rdfpandas_namespace.integer, Literal(10)))
+        g.add((rdfpandas_namespace.two, rdfpandas_namespace.string, Literal('String 2')))
+        g.add((rdfpandas_namespace.two, rdfpandas_namespace.curie, rdfpandas_namespace.one))
+        csv = rdfpandas.to_dataframe(g, order = 'canonical').to_csv(index_label = '@id')
+
+        df = pd.read_csv(io.StringIO(csv), index_col = '@id', dtype = str)
+        df_result = rdfpandas.to_dataframe(rdfpandas.to_graph(df, g.namespace_manager), order = 'canonical')
+
+        self.assertEqual(df_result.to_csv(index_label = '@id'), csv)
+        self.assertIn('rdfpandas:one,10,', csv)
+
+    def test_should_order_literals_equal_in_value_by_lexical_form(self):
+        """Should return the same CSV for Literals equal in value added in either order
+        """
+
+        one = URIRef('http://github.com/cadmiumkitty/rdfpandas/one')
+        triples = [
+            (one, URIRef('http://github.com/cadmiumkitty/rdfpandas/decimal'), Literal('1.0', datatype = XSD.decimal)),
+            (one, URIRef('http://github.com/cadmiumkitty/rdfpandas/decimal'), Literal('1.00', datatype = XSD.decimal)),
+            (one, URIRef('http://github.com/cadmiumkitty/rdfpandas/string'), Literal('String 1')),
+            (one, URIRef('http://github.com/cadmiumkitty/rdfpandas/string'), Literal('String 1', datatype = XSD.string))]
+        g = Graph()
+        g_reversed = Graph()
+        for triple in triples:
+            g.add(triple)
+        for triple in reversed(triples):
+            g_reversed.add(triple)
+
+        for order in ('stable', 'external', 'canonical'):
+            # Terms first seen in reverse order get ids in reverse order
+            td_reversed = rdfpandas.TermDictionary()
+            td_reversed.encode_triples(reversed(triples))
+            df_result = rdfpandas.to_dataframe(g, order = order)
+            self.assertEqual(df_result.to_csv(), rdfpandas.to_dataframe(g_reversed, td_reversed, order = order).to_csv())
+            self.assertEqual(df_result.iloc[0].dropna().tolist(), ['1.0', '1.00', 'String 1', 'String 1'])
+
+    def test_should_order_numeric_columns_by_value(self):
+        """Should order columns of numeric Literals of a predicate by value, as in rdfLib term order
+        """
+
+        one = URIRef('http://github.com/cadmiumkitty/rdfpandas/one')
+        number = URIRef('http://github.com/cadmiumkitty/rdfpandas/number')
+        g = Graph()
+        g.add((one, number, Literal(1)))
+        g.add((one, number, Literal('2.5', datatype = XSD.decimal)))
+
+        for order in ('stable', 'external', 'canonical'):
+            self.assertEqual(list(rdfpandas.to_dataframe(g, order = order).columns), [
+                'http://github.com/cadmiumkitty/rdfpandas/number{Literal}(xsd:integer)',
+                'http://github.com/cadmiumkitty/rdfpandas/number{Literal}(xsd:decimal)'])
+
+    def test_should_convert_dataset_to_data_frame(self):
+        """Should return DataFrame with graph and subject index for Dataset
+        """
+
+        d = Dataset()
+        d.bind('rdfpandas', Namespace('http://github.com/cadmiumkitty/rdfpandas/'))
+        d.add((URIRef('http://github.com/cadmiumkitty/rdfpandas/one'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/string'), 
+                        Literal('String 1')))
+        d.graph(URIRef('http://github.com/cadmiumkitty/rdfpandas/graph')).add((URIRef('http://github.com/cadmiumkitty/rdfpandas/one'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/string'), 
+                        Literal('String 1 (graph)')))
+        d.graph(URIRef('http://github.com/cadmiumkitty/rdfpandas/graph')).add((URIRef('http://github.com/cadmiumkitty/rdfpandas/one'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/string'), 
+                        Literal('String 2 (graph)')))
+        d.graph(URIRef('http://github.com/cadmiumkitty/rdfpandas/graph')).add((URIRef('http://github.com/cadmiumkitty/rdfpandas/two'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/curie'), 
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/one')))
+
+        index = pd.MultiIndex.from_tuples([
+            ('rdfpandas:graph', 'rdfpandas:one'), 
+            ('rdfpandas:graph', 'rdfpandas:two'),
+            ('urn:x-rdflib:default', 'rdfpandas:one')])
+        df_expected = pd.DataFrame({
+            'rdfpandas:string{Literal}[0]': pd.Series(data = ['String 1 (graph)', np.nan, 'String 1'], index = index, dtype = object),
+            'rdfpandas:string{Literal}[1]': pd.Series(data = ['String 2 (graph)', np.nan, np.nan], index = index, dtype = object),
+            'rdfpandas:curie{URIRef}': pd.Series(data = [np.nan, 'rdfpandas:one', np.nan], index = index, dtype = object)
+            })
+
+        df_result = rdfpandas.dataset_to_dataframe(d)
+
+        pd.testing.assert_frame_equal(df_expected, df_result, check_like = True)
+
+    def test_should_roundtrip_dataset_to_data_frame_to_dataset(self):
+        """Should roundtrip Dataset -> DF -> Dataset using index or graph column
+        """
+
+        g = rdflib.Graph()
+        g.parse('./tests/rdf/test.ttl', format = 'ttl')
+        d = Dataset()
+        d.namespace_manager = g.namespace_manager
+        for (graph, triples) in [(DATASET_DEFAULT_GRAPH_ID, list(g)[:10]), (URIRef('http://github.com/cadmiumkitty/rdfpandas/graph'), list(g)[5:])]:
+            for triple in triples:
+                d.graph(graph).add(triple)
+
+        df = rdfpandas.dataset_to_dataframe(d)
+        d_result_index = rdfpandas.to_dataset(df, d.namespace_manager)
+        d_result_column = rdfpandas.to_dataset(df.reset_index(level = 0, names = '@graph'), d.namespace_manager, batch_size = 3)
+
+        for d_result in (d_result_index, d_result_column):
+            self.assertEqual(sorted(g.identifier for g in d_result.graphs()), sorted(g.identifier for g in d.graphs()))
+            for graph in d.graphs():
+                self.assertEqual(rdflib.compare.isomorphic(graph, d_result.graph(graph.identifier)), True)
+
+    def test_should_reject_data_frame_without_graphs(self):
+        """Should raise ValueError for DataFrame without graph index or column
+        """
+
+        with self.assertRaises(ValueError):
+            rdfpandas.to_dataset(pd.DataFrame({'rdfpandas:string{Literal}': ['String 1']}, index = ['rdfpandas:one']))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+from .context import rdfpandas
+
+import pandas as pd
+import numpy as np
+
+from rdflib import Graph, Literal, URIRef, BNode, Namespace
+
+import unittest
+
+
+class SelectConversionTestCase(unittest.TestCase):
+    """Tests conversion from SPARQL SELECT Result to DataFrame"""
+
+    def setUp(self):
+        self.g = Graph()
+        self.g.bind('rdfpandas', Namespace('http://github.com/cadmiumkitty/rdfpandas/'))
+        self.g.add((URIRef('http://github.com/cadmiumkitty/rdfpandas/one'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/value'),
+                        Literal('String 1')))
+        self.g.add((URIRef('http://github.com/cadmiumkitty/rdfpandas/two'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/value'),
+                        Literal(10)))
+        self.g.add((URIRef('http://github.com/cadmiumkitty/rdfpandas/two'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/label'),
+                        Literal('Two', lang = 'en')))
+        self.g.add((URIRef('http://github.com/cadmiumkitty/rdfpandas/three'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/value'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/one')))
+        self.g.add((URIRef('http://github.com/cadmiumkitty/rdfpandas/four'),
+                        URIRef('http://github.com/cadmiumkitty/rdfpandas/value'),
+                        BNode('12345')))
+        self.query = '''
+            PREFIX rdfpandas: <http://github.com/cadmiumkitty/rdfpandas/>
+            SELECT ?s ?value ?label WHERE {
+                ?s rdfpandas:value ?value
+                OPTIONAL { ?s rdfpandas:label ?label }
+            } ORDER BY ?s'''
+
+    def test_should_convert_select_result_to_data_frame(self):
+        """Should return DataFrame with a column per variable and NaN for unbound variables
+        """
+
+        df_expected = pd.DataFrame({
+            's': ['rdfpandas:four', 'rdfpandas:one', 'rdfpandas:three', 'rdfpandas:two'],
+            'value': ['12345', 'String 1', 'rdfpandas:one', '10'],
+            'label': [np.nan, np.nan, np.nan, 'Two']
+            }, dtype = object)
+
+        df_result = rdfpandas.select_to_dataframe(self.g.query(self.query), self.g.namespace_manager)
+
+        pd.testing.assert_frame_equal(df_expected, df_result)
+
+    def test_should_convert_select_result_to_typed_data_frame(self):
+        """Should return DataFrame with a column per variable and type of the value
+        """
+
+        df_expected = pd.DataFrame({
+            's{URIRef}': ['rdfpandas:four', 'rdfpandas:one', 'rdfpandas:three', 'rdfpandas:two'],
+            'value{BNode}': ['12345', np.nan, np.nan, np.nan],
+            'value{Literal}': [np.nan, 'String 1', np.nan, np.nan],
+            'value{URIRef}': [np.nan, np.nan, 'rdfpandas:one', np.nan],
+            'value{Literal}(xsd:integer)': [np.nan, np.nan, np.nan, '10'],
+            'label{Literal}@en': [np.nan, np.nan, np.nan, 'Two']
+            }, dtype = object)
+
+        df_result = rdfpandas.select_to_dataframe(self.g.query(self.query), self.g.namespace_manager, typed = True)
+
+        pd.testing.assert_frame_equal(df_expected, df_result)
+
+    def test_should_convert_empty_select_result_to_empty_data_frame(self):
+        """Should return empty DataFrame with a column per variable
+        """
+
+        result = self.g.query('SELECT ?s ?o WHERE { ?s <http://github.com/cadmiumkitty/rdfpandas/unknown> ?o }')
+        df_result = rdfpandas.select_to_dataframe(result)
+
+        self.assertEqual(df_result.empty, True)
+        self.assertEqual(list(df_result.columns), ['s', 'o'])
+
+        df_result = rdfpandas.select_to_dataframe(result, typed = True)
+
+        self.assertEqual(df_result.empty, True)
+        self.assertEqual(list(df_result.columns), ['s', 'o'])
+
+    def test_should_reject_non_select_result(self):
+        """Should raise ValueError for ASK and CONSTRUCT results
+        """
+
+        with self.assertRaises(ValueError):
+            rdfpandas.select_to_dataframe(self.g.query('ASK { ?s ?p ?o }'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+from .context import rdfpandas
+
+import pandas as pd
+import numpy as np
+
+from rdflib import Graph, URIRef, Namespace
+from rdflib.namespace import NamespaceManager
+from rdfpandas.sparql import SparqlUpdateSink, SparqlUpdateError, to_sparql_update
+import rdflib.compare
+
+import asyncio
+import http.server
+import threading
+import time
+import unittest
+
+
+class StubUpdateHandler(http.server.BaseHTTPRequestHandler):
+    """Applies INSERT DATA requests to the Graph of the server, failing first requests if asked to"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8')
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.requests.append((self.headers['Content-Type'], body))
+            status = self.server.statuses.pop(0) if self.server.statuses else 204
+            if status == 204:
+                self.server.graph.update(body)
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SparqlUpdateTestCase(unittest.TestCase):
+    """Tests inserting DataFrame into SPARQL Update endpoint"""
+
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StubUpdateHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.statuses = []
+        self.server.delay = 0
+        self.server.graph = Graph()
+        self.endpoint = f'http://127.0.0.1:{self.server.server_address[1]}/update'
+        self.thread = threading.Thread(target = self.server.serve_forever, daemon = True)
+        self.thread.start()
+
+        self.namespace_manager = NamespaceManager(Graph())
+        self.namespace_manager.bind('rdfpandas', Namespace('http://github.com/cadmiumkitty/rdfpandas/'))
+        index = [f'rdfpandas:s{i}' for i in range(10)]
+        self.df = pd.DataFrame({
+            'rdfpandas:string{Literal}@en': pd.Series(data = [f'String "{i}"\n' for i in range(10)], index = index, dtype = np.str_),
+            'rdfpandas:curie{URIRef}': pd.Series(data = ['skos:broader'] * 9 + [np.nan], index = index, dtype = np.str_)
+            })
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_should_insert_data_frame_in_chunks(self):
+        """Should send one INSERT DATA request per chunk and insert all triples
+        """
+
+        triples = asyncio.run(to_sparql_update(self.df, self.endpoint, self.namespace_manager, chunk_size = 3, concurrency = 2))
+
+        g_expected = rdfpandas.to_graph(self.df, self.namespace_manager)
+
+        self.assertEqual(triples, 19)
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertEqual(self.server.requests[0][0], 'application/sparql-update; charset=utf-8')
+        self.assertEqual(rdflib.compare.isomorphic(g_expected, self.server.graph), True)
+
+    def test_should_insert_data_frame_into_named_graph(self):
+        """Should wrap triples into GRAPH for the named graph
+        """
+
+        graph = URIRef('http://github.com/cadmiumkitty/rdfpandas/graph')
+        self.server.graph = rdflib.Dataset()
+
+        async def send():
+            async with SparqlUpdateSink(self.endpoint, self.namespace_manager, graph = graph) as sink:
+                await sink.send(self.df)
+
+        asyncio.run(send())
+
+        g_expected = rdfpandas.to_graph(self.df, self.namespace_manager)
+
+        self.assertEqual(rdflib.compare.isomorphic(g_expected, self.server.graph.graph(graph)), True)
+        self.assertEqual(len(self.server.graph.default_graph), 0)
+
+    def test_should_retry_on_server_error(self):
+        """Should retry requests failed with 503 and fail on 400
+        """
+
+        self.server.statuses = [503, 503]
+        triples = asyncio.run(to_sparql_update(self.df, self.endpoint, self.namespace_manager, concurrency = 1, backoff = 0.01))
+
+        self.assertEqual(triples, 19)
+        self.assertEqual(len(self.server.requests), 3)
+
+        self.server.statuses = [400]
+        with self.assertRaises(SparqlUpdateError):
+            asyncio.run(to_sparql_update(self.df, self.endpoint, self.namespace_manager, concurrency = 1, backoff = 0.01))
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_should_drop_queued_requests_on_error(self):
+        """Should cancel queued requests and keep the error of async with body instead of failed requests
+        """
+
+        self.server.delay = 0.2
+
+        async def send():
+            async with SparqlUpdateSink(self.endpoint, self.namespace_manager, concurrency = 1) as sink:
+                await sink.send(self.df.iloc[0:5])
+                await sink.send(self.df.iloc[5:10])
+                raise KeyError('body')
+
+        with self.assertRaises(KeyError):
+            asyncio.run(send())
+        # The first request may already be sent, the queued one is dropped
+        self.assertLess(len(self.server.requests), 2)
+
+        self.server.delay = 0
+        self.server.statuses = [400]
+
+        async def fail():
+            async with SparqlUpdateSink(self.endpoint, self.namespace_manager, concurrency = 1) as sink:
+                await sink.send(self.df)
+                while sink._error is None:
+                    await asyncio.sleep(0.01)
+                raise KeyError('body')
+
+        with self.assertRaises(KeyError):
+            asyncio.run(fail())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+from .context import rdfpandas
+
+import numpy as np
+
+from rdflib import Graph, Literal, URIRef, BNode
+from rdflib.namespace import XSD
+from rdfpandas.terms import TermDictionary
+
+import os
+import tempfile
+import unittest
+
+
+class TermDictionaryTestCase(unittest.TestCase):
+    """Tests encoding of rdfLib terms into integer ids"""
+
+    def test_should_encode_terms_to_dense_ids(self):
+        """Should return the same id for the same term and dense ids for new terms.
+        """
+
+        td = TermDictionary()
+
+        self.assertEqual(td.encode(URIRef('http://github.com/cadmiumkitty/rdfpandas/one')), 0)
+        self.assertEqual(td.encode(Literal('one')), 1)
+        self.assertEqual(td.encode(URIRef('http://github.com/cadmiumkitty/rdfpandas/one')), 0)
+        self.assertEqual(td.encode(BNode('one')), 2)
+        self.assertEqual(len(td), 3)
+        self.assertEqual(td.decode(1), Literal('one'))
+
+    def test_should_encode_triples_to_array(self):
+        """Should return array of ids in iteration order.
+        """
+
+        td = TermDictionary()
+        triples = [
+            (URIRef('http://github.com/cadmiumkitty/rdfpandas/one'), URIRef('http://github.com/cadmiumkitty/rdfpandas/string'), Literal('String 1')),
+            (URIRef('http://github.com/cadmiumkitty/rdfpandas/two'), URIRef('http://github.com/cadmiumkitty/rdfpandas/string'), Literal('String 1'))
+            ]
+
+        np.testing.assert_array_equal(td.encode_triples(triples), np.array([[0, 1, 2], [3, 1, 2]]))
+        self.assertEqual(td.encode_triples([]).shape, (0, 3))
+
+    def test_should_encode_quads_to_array(self):
+        """Should encode graphs by their identifiers.
+        """
+
+        td = TermDictionary()
+        g = Graph(identifier = URIRef('http://github.com/cadmiumkitty/rdfpandas/graph'))
+        quads = [
+            (URIRef('http://github.com/cadmiumkitty/rdfpandas/one'), URIRef('http://github.com/cadmiumkitty/rdfpandas/string'), Literal('String 1'), g),
+            (URIRef('http://github.com/cadmiumkitty/rdfpandas/one'), URIRef('http://github.com/cadmiumkitty/rdfpandas/string'), Literal('String 1'), URIRef('http://github.com/cadmiumkitty/rdfpandas/graph'))
+            ]
+
+        np.testing.assert_array_equal(td.encode_quads(quads), np.array([[0, 1, 2, 3], [0, 1, 2, 3]]))
+        self.assertEqual(td.decode(3), URIRef('http://github.com/cadmiumkitty/rdfpandas/graph'))
+
+    def test_should_assign_idls_and_ranks(self):
+        """Should keep instance, datatype and language of terms and rank terms in rdfLib order.
+        """
+
+        td = TermDictionary()
+        terms = [Literal('b', lang = 'en'), URIRef('http://github.com/cadmiumkitty/rdfpandas/one'), Literal('a', lang = 'en'), Literal(10)]
+        ids = [td.encode(t) for t in terms]
+
+        self.assertEqual(td.idl(td.idls()[ids[0]]), ('Literal', None, 'en'))
+        self.assertEqual(td.idl(td.idls()[ids[1]]), ('URIRef', None, None))
+        self.assertEqual(td.idl(td.idls()[ids[3]]), ('Literal', XSD.integer, None))
+        self.assertEqual(td.idls()[ids[0]], td.idls()[ids[2]])
+
+        ranks = td.ranks()
+        self.assertEqual([terms[i] for i in np.argsort(ranks)], sorted(terms))
+
+    def test_should_rank_terms_in_external_runs(self):
+        """Should give the same ranks sorting in runs spilled to disk as sorting in memory.
+        """
+
+        g = Graph()
+        g.parse('./tests/rdf/test.ttl', format = 'ttl')
+        g.add((BNode('one'), URIRef('http://github.com/cadmiumkitty/rdfpandas/bnode'), BNode('two')))
+        g.add((BNode('one'), URIRef('http://github.com/cadmiumkitty/rdfpandas/string'), Literal('String 1', datatype = XSD.string)))
+        td = TermDictionary()
+        td.encode_triples(g)
+        ranks = td.ranks().copy()
+
+        for run_size in (1, 3, len(td)):
+            td_external = TermDictionary()
+            td_external.encode_triples(g)
+            with tempfile.TemporaryDirectory() as path:
+                np.testing.assert_array_equal(td_external.ranks(run_size = run_size, directory = path), ranks)
+                self.assertEqual(os.listdir(path), [])
+
+        with self.assertRaises(ValueError):
+            TermDictionary().ranks(run_size = 0)
+
+    def test_should_rank_numeric_literals_by_value(self):
+        """Should rank numeric Literals by value across datatypes, with NaN last, in memory and in external runs.
+        """
+
+        terms = [Literal(float('nan')), Literal('2.5', datatype = XSD.decimal), Literal(1.5), Literal(1), Literal(1.0)]
+        expected = [Literal(1.0), Literal(1), Literal(1.5), Literal('2.5', datatype = XSD.decimal), Literal(float('nan'))]
+
+        for ordered_terms in (terms, list(reversed(terms))):
+            td = TermDictionary()
+            td.encode_terms(ordered_terms)
+            ranks = td.ranks().copy()
+            self.assertEqual([str(ordered_terms[i]) for i in np.argsort(ranks)], [str(t) for t in expected])
+            self.assertEqual([ordered_terms[i].datatype for i in np.argsort(ranks)], [t.datatype for t in expected])
+            td_external = TermDictionary()
+            td_external.encode_terms(ordered_terms)
+            np.testing.assert_array_equal(td_external.ranks(run_size = 1), ranks)
+
+    def test_should_save_and_load(self):
+        """Should load the same terms, ids and ranks as were saved.
+        """
+
+        g = Graph()
+        g.parse('./tests/rdf/test.ttl', format = 'ttl')
+        g.add((BNode('one'), URIRef('http://github.com/cadmiumkitty/rdfpandas/bnode'), BNode('two')))
+        td = TermDictionary()
+        triples = td.encode_triples(g)
+
+        with tempfile.TemporaryDirectory() as path:
+            td.save(path)
+            td_result = TermDictionary.load(path)
+
+            self.assertEqual(len(td_result), len(td))
+            self.assertEqual([td_result.decode(i) for i in range(len(td_result))], [td.decode(i) for i in range(len(td))])
+            np.testing.assert_array_equal(td_result.ranks(), td.ranks())
+            np.testing.assert_array_equal(td_result.idls(), td.idls())
+            self.assertEqual([td_result.idl(i) for i in td_result.idls()], [td.idl(i) for i in td.idls()])
+            np.testing.assert_array_equal(td_result.encode_triples(g), triples)
+
+    def test_should_recompute_ranks_saved_by_other_version(self):
+        """Should ignore ranks of dictionaries saved without version and rebuild their idls.
+        """
+
+        g = Graph()
+        g.parse('./tests/rdf/test.ttl', format = 'ttl')
+        td = TermDictionary()
+        td.encode_triples(g)
+
+        with tempfile.TemporaryDirectory() as path:
+            td.save(path)
+            for name in ('version', 'idls', 'idl_instances', 'idl_instances_offsets', 'idl_datatypes',
+                    'idl_datatypes_offsets', 'idl_languages', 'idl_languages_offsets'):
+                os.remove(os.path.join(path, f'{name}.npy'))
+            np.save(os.path.join(path, 'ranks.npy'), td.ranks()[::-1].copy())
+            td_result = TermDictionary.load(path)
+
+            np.testing.assert_array_equal(td_result.ranks(), td.ranks())
+            np.testing.assert_array_equal(td_result.idls(), td.idls())
+
+    def test_should_convert_graph_to_data_frame_with_shared_dictionary(self):
+        """Should return the same DataFrame when reusing TermDictionary.
+        """
+
+        g = Graph()
+        g.parse('./tests/rdf/test.ttl', format = 'ttl')
+        td = TermDictionary()
+        df_expected = rdfpandas.to_dataframe(g)
+
+        rdfpandas.to_dataframe(g, td)
+        df_result = rdfpandas.to_dataframe(g, td)
+
+        self.assertEqual(len(td), len(set(t for triple in g for t in triple)))
+        self.assertEqual(df_result.to_csv(), df_expected.to_csv())
+
+
+if __name__ == '__main__':
+    unittest.main()